@@ -0,0 +1,156 @@
+"""Pre-scaled sprite atlas, packed once and memory-mapped at startup.
+
+The game describes its sprites as a list of entries:
+
+    {"key": "fruit/Apple", "file": "apple.png", "size": (70, 70),
+     "color": (220, 20, 60), "fallback": "circle"}
+
+optionally with "via": (w, h) to scale through an intermediate size (the
+menu icons are the 70x70 sprites scaled again to 50x50). build() decodes
+and scales every source (or draws its fallback when the file is missing),
+shelf-packs the results into one raw RGBA atlas and writes a JSON index
+with each source's mtime and SHA-1. load() rebuilds when the spec or any
+source has changed, then maps the atlas file and wraps it in a surface
+without any PNG decoding or rescaling.
+"""
+import hashlib
+import json
+import mmap
+import os
+import pygame
+
+ATLAS_FILE = "sprites.atlas"
+INDEX_FILE = "sprites.json"
+ATLAS_WIDTH = 1024
+VERSION = 1
+
+# ----------- Build -------------
+def _file_info(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return {"mtime": st.st_mtime, "sha1": digest}
+
+def _spec_hash(spec):
+    return hashlib.sha1(repr([sorted(e.items()) for e in spec]).encode()).hexdigest()
+
+def _render(entry, directory):
+    size = tuple(entry["size"])
+    src = tuple(entry.get("via", size))
+    try:
+        img = pygame.image.load(os.path.join(directory, entry["file"]))
+        img = pygame.transform.scale(img.convert_alpha() if pygame.display.get_surface() else img, src)
+    except Exception:
+        img = pygame.Surface(src, pygame.SRCALPHA)
+        if entry.get("fallback") == "circle":
+            pygame.draw.circle(img, entry["color"], (src[0]//2, src[1]//2), src[0]//2)
+        else:
+            img.fill(entry["color"])
+    if src != size:
+        img = pygame.transform.scale(img, size)
+    return img
+
+def build(spec, directory="."):
+    """Pack every sprite in spec into the atlas and write its index."""
+    images = [(e["key"], _render(e, directory)) for e in spec]
+
+    # Shelf packing: tallest first, fill rows left to right
+    rects = {}
+    x = y = shelf = 0
+    for key, img in sorted(images, key=lambda kv: -kv[1].get_height()):
+        w, h = img.get_size()
+        if x + w > ATLAS_WIDTH:
+            x, y, shelf = 0, y + shelf, 0
+        rects[key] = (x, y, w, h)
+        x += w
+        shelf = max(shelf, h)
+    height = max(1, y + shelf)
+
+    atlas = pygame.Surface((ATLAS_WIDTH, height), pygame.SRCALPHA)
+    for key, img in images:
+        atlas.blit(img, rects[key][:2])
+
+    tmp = os.path.join(directory, ATLAS_FILE + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(pygame.image.tobytes(atlas, "RGBA"))
+    os.replace(tmp, os.path.join(directory, ATLAS_FILE))
+
+    index = {
+        "version": VERSION,
+        "spec": _spec_hash(spec),
+        "size": [ATLAS_WIDTH, height],
+        "sprites": rects,
+        "sources": {e["file"]: _file_info(os.path.join(directory, e["file"])) for e in spec},
+    }
+    _write_index(index, directory)
+    return index
+
+def _write_index(index, directory):
+    with open(os.path.join(directory, INDEX_FILE), "w") as f:
+        json.dump(index, f, indent=1)
+
+# ----------- Load -------------
+def is_stale(index, spec, directory="."):
+    """True if the atlas must be rebuilt. Sources that were touched but
+    not changed get their new mtime written back to the index, so they
+    are not hashed again on every launch."""
+    if index.get("version") != VERSION or index.get("spec") != _spec_hash(spec):
+        return True
+    refreshed = False
+    for name, info in index["sources"].items():
+        path = os.path.join(directory, name)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        if info is None or mtime is None:
+            if (info is None) != (mtime is None): return True
+            continue
+        # Cheap mtime check first; only hash when it moved
+        if mtime != info["mtime"]:
+            if _file_info(path)["sha1"] != info["sha1"]: return True
+            info["mtime"] = mtime
+            refreshed = True
+    if refreshed:
+        try: _write_index(index, directory)
+        except OSError: pass
+    return False
+
+_mapped = []   # keeps the atlas mapping alive while its surface is in use
+
+def load(spec, directory="."):
+    """Return {key: surface} from the atlas, rebuilding it first if stale."""
+    index = None
+    try:
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+        if is_stale(index, spec, directory):
+            index = None
+        elif not os.path.exists(os.path.join(directory, ATLAS_FILE)):
+            index = None
+    except (OSError, ValueError, KeyError):
+        index = None
+    if index is None:
+        index = build(spec, directory)
+
+    w, h = index["size"]
+    with open(os.path.join(directory, ATLAS_FILE), "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _mapped.append(mm)
+    atlas = pygame.image.frombuffer(mm, (w, h), "RGBA")
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+        _mapped.remove(mm)
+        mm.close()
+    return {key: atlas.subsurface(r) for key, r in index["sprites"].items()}
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from juicy_time import sprite_spec
+    pygame.init()
+    index = build(sprite_spec(), os.path.dirname(os.path.abspath(__file__)))
+    print(f"Packed {len(index['sprites'])} sprites into a {index['size'][0]}x{index['size'][1]} atlas")
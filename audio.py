@@ -0,0 +1,141 @@
+import io
+import time
+import pygame
+
+# Reserved channels per effect category; the rest of the mixer's channels
+# stay free for anything played with plain Sound.play()
+CATEGORIES = {"cut": 3, "fill": 2, "jingle": 1}
+
+# ----------- Audio Engine -------------
+class AudioEngine:
+    """Mixer setup, a bank of decoded effects and the music track.
+
+    pre_init() must run before pygame.init() so the mixer opens with a
+    small buffer (buffer samples at frequency Hz is the output latency).
+    Each effect category gets its own reserved channels; when they are all
+    busy the voice that started first is cut off for the new one, so a
+    burst of cuts never delays a sound or steals the win jingle's channel.
+    Music is only loaded (and decoded) when the track changes.
+
+    SDL_mixer does not report underruns, so monitor() estimates them: if
+    the music position advances slower than the wall clock by more than
+    two buffers, the device ran dry for that long.
+    """
+
+    def __init__(self, frequency=44100, buffer=256, categories=CATEGORIES):
+        self.frequency = frequency
+        self.buffer = buffer
+        self.categories = dict(categories)
+        self.enabled = False
+        self.bank = {}        # name -> (sound, category)
+        self.pools = {}       # category -> [(channel, started at)]
+        self.music = None     # track loaded in pygame.mixer.music
+        self.plays = 0
+        self.steals = 0
+        self.underruns = 0
+        self.underrun_ms = 0.0
+        self._mon = None
+
+    def pre_init(self):
+        pygame.mixer.pre_init(self.frequency, -16, 2, self.buffer)
+
+    def start(self):
+        """Reserve the category channels once the mixer is open."""
+        if not pygame.mixer.get_init():
+            return False
+        reserved = sum(self.categories.values())
+        pygame.mixer.set_num_channels(max(8, reserved + 4))
+        pygame.mixer.set_reserved(reserved)
+        n = 0
+        for category, count in self.categories.items():
+            self.pools[category] = [[pygame.mixer.Channel(n + i), 0.0] for i in range(count)]
+            n += count
+        self.enabled = True
+        return True
+
+    @property
+    def latency_ms(self):
+        init = pygame.mixer.get_init()
+        freq = init[0] if init else self.frequency
+        return self.buffer * 1000 / freq
+
+    # ----------- Effects -------------
+    def add(self, name, sound, category):
+        if sound is not None:
+            self.bank[name] = (sound, category)
+
+    def play(self, name):
+        entry = self.bank.get(name)
+        if not self.enabled or entry is None: return
+        sound, category = entry
+        pool = self.pools[category]
+        slot = next((s for s in pool if not s[0].get_busy()), None)
+        if slot is None:
+            slot = min(pool, key=lambda s: s[1])
+            self.steals += 1
+        slot[0].play(sound)
+        slot[1] = time.perf_counter()
+        self.plays += 1
+
+    # ----------- Music -------------
+    def play_music(self, name, volume, loops=0, data=None, restart=False):
+        """Play a track, reusing it if it is already loaded.
+
+        A track that is already playing keeps playing unless restart is
+        set; a loaded but stopped one starts again without a reload.
+        data is the file's bytes, if they were preloaded.
+        """
+        if not self.enabled: return False
+        try:
+            if name != self.music:
+                if data: pygame.mixer.music.load(io.BytesIO(data), name)
+                else: pygame.mixer.music.load(name)
+                self.music = name
+            elif pygame.mixer.music.get_busy() and not restart:
+                pygame.mixer.music.set_volume(volume)
+                return True
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(loops)
+            self._mon = None
+            return True
+        except:
+            self.music = None
+            return False
+
+    def stop_music(self):
+        if self.enabled: pygame.mixer.music.stop()
+        self._mon = None
+
+    # ----------- Monitoring -------------
+    def monitor(self, interval=0.5):
+        """Call once a frame: compares music position against wall time."""
+        if not self.enabled or not pygame.mixer.music.get_busy():
+            self._mon = None
+            return
+        now = time.perf_counter()
+        pos = pygame.mixer.music.get_pos()
+        if self._mon is None:
+            self._mon = (now, pos)
+            return
+        t0, p0 = self._mon
+        if now - t0 < interval: return
+        self._mon = (now, pos)
+        if pos < p0: return   # looped
+        behind = (now - t0) * 1000 - (pos - p0)
+        if behind > 2 * self.latency_ms:
+            self.underruns += 1
+            self.underrun_ms += behind
+
+    def stats(self):
+        return {"enabled": self.enabled, "mixer": pygame.mixer.get_init(),
+                "buffer": self.buffer, "latency_ms": round(self.latency_ms, 2),
+                "plays": self.plays, "steals": self.steals,
+                "underruns": self.underruns, "underrun_ms": round(self.underrun_ms, 1)}
+
+    def report(self):
+        s = self.stats()
+        print(f"Audio: mixer {s['mixer']}, buffer {s['buffer']} samples "
+              f"({s['latency_ms']} ms), {s['plays']} effects played, {s['steals']} voices stolen, "
+              f"{s['underruns']} underruns ({s['underrun_ms']} ms)")
+
+audio = AudioEngine()
@@ -0,0 +1,268 @@
+"""Headless benchmarks for juicy_time.py and harika.py.
+
+Runs on the SDL dummy video/audio drivers, so it works on a build machine
+with no display or sound card. Each suite runs in its own interpreter (both
+games open a window at import/init time):
+
+    python bench.py                          print results as JSON
+    python bench.py --out=results.json       ... and write them to a file
+    python bench.py --save-baseline          store results as the baseline
+    python bench.py --threshold=0.1 --threshold-for=video.decode_fps=0.3
+
+Every metric is compared against the baseline (bench_baseline.json by
+default); one that got worse by more than its threshold (a fraction of the
+baseline value) is reported as a regression and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+os.chdir(HERE)
+
+BASELINE = "bench_baseline.json"
+SUITES = ("game_core", "juicy_time", "harika", "video", "cold_start")
+
+def metric(value, unit, better="higher"):
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+def rate(fn, n):
+    """Calls per second of fn(i) over n calls."""
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - start)
+
+# ----------- Simulation -------------
+def suite_game_core(opts):
+    import game_core
+    games = opts.games
+    start = time.perf_counter()
+    for seed in range(games):
+        game_core.simulate(game_core.typist(seed=seed), seed=seed)
+    return {"game_core.games_per_s": metric(games / (time.perf_counter() - start), "games/s")}
+
+# ----------- Rendering -------------
+class _Manager:
+    """Stands in for SceneManager: records the switch instead of making it."""
+    def __init__(self):
+        self.pending = None
+    def switch(self, scene, delay_ms=0):
+        self.pending = scene
+
+def text_metrics(prefix, draw, n):
+    from text_cache import text_cache
+    out = {}
+    text_cache.clear()
+    out[prefix + "text_cached_per_s"] = metric(rate(lambda i: draw("Score: 10", 28), n), "calls/s")
+    text_cache.clear()
+    out[prefix + "text_uncached_per_s"] = metric(rate(lambda i: draw(f"Time: {i}", 28), n), "calls/s")
+    return out
+
+def gameplay_fps(campaign, frames):
+    """Scripted typist at a fixed 60 Hz step, frames as fast as they go."""
+    import pygame
+    import game_core
+    import juicy_time as jt
+    jt.state.campaign = game_core.load_campaign(campaign)
+    jt.init()
+    scene = jt.GameScene(level=1)
+    scene.manager = _Manager()
+    scene.enter()
+    policy = game_core.typist(seed=0)
+    dt = 1000 / 60
+    start = time.perf_counter()
+    for _ in range(frames):
+        for key in policy(jt.state):
+            scene.handle(pygame.event.Event(pygame.KEYDOWN, key=0, unicode=key))
+        scene.update(dt)
+        scene.render()
+        if scene.manager.pending is not None:
+            scene.manager.pending = None
+            scene.enter()
+    return metric(frames / (time.perf_counter() - start), "fps")
+
+def suite_juicy_time(opts):
+    import pygame
+    import juicy_time as jt
+    out = {"juicy_time.gameplay_fps": gameplay_fps("juicy_time", opts.frames)}
+    out["juicy_time.draw_calls_per_frame"] = metric(jt.renderer.stats()["draw_calls_per_frame"], "calls", "lower")
+    out["juicy_time.blits_per_frame"] = metric(jt.renderer.stats()["blits_per_frame"], "blits", "lower")
+
+    out.update(text_metrics("juicy_time.", lambda text, size: jt.draw_text_with_outline(
+        text, size, jt.BLACK, jt.WHITE, 100, 100), opts.calls))
+
+    target = pygame.Surface(jt.screen.get_size())
+    def boxes(i):
+        for b in jt.state.boxes:
+            b["fill"] = (i % 6) * 0.2
+        jt.draw_boxes(target)
+    out["juicy_time.draw_boxes_per_s"] = metric(rate(boxes, opts.calls // 4), "calls/s")
+    return out
+
+def suite_harika(opts):
+    # harika.py is the shared engine playing its own campaign, so only its
+    # gameplay differs from juicy_time's
+    return {"harika.gameplay_fps": gameplay_fps("harika", opts.frames)}
+
+# ----------- Video -------------
+def suite_video(opts):
+    from game_core import WIDTH, HEIGHT
+    from video_intro import VideoDecoder, frame_surface, END
+    if not os.path.exists(opts.video):
+        print(f"bench: {opts.video} not found, skipping video", file=sys.stderr)
+        return {}
+    decoder = VideoDecoder(opts.video, (WIDTH, HEIGHT))
+    start = time.perf_counter()
+    decoder.start()
+    if not decoder.wait_opened(timeout=30):
+        print(f"bench: could not open {opts.video}, skipping video", file=sys.stderr)
+        return {}
+    opened = time.perf_counter()
+
+    # Decode as fast as the worker goes, wrapping each frame as the intro does
+    frames = 0
+    while frames < opts.video_frames:
+        item = decoder.frames.get()
+        if item is END: break
+        frame_surface(item[1])
+        frames += 1
+    took = time.perf_counter() - opened
+    decoder.stop()
+    return {"video.open_ms": metric((opened - start) * 1000, "ms", "lower"),
+            "video.decode_fps": metric(frames / took, "fps")}
+
+# ----------- Cold Start -------------
+# Runs a game script and exits on its first flip/update: the time from
+# launching the interpreter to the first menu frame on screen. Scores are
+# off (telemetry is off unless asked for), so a run leaves no files and
+# no writer thread competes for the startup time.
+FIRST_FRAME = """
+import os, sys, runpy, pygame
+flip, update = pygame.display.flip, pygame.display.update
+def first_frame(*args, real=None):
+    real(*args)
+    print("first frame", flush=True)
+    os._exit(0)
+pygame.display.flip = lambda *a: first_frame(*a, real=flip)
+pygame.display.update = lambda *a: first_frame(*a, real=update)
+sys.path.insert(0, os.getcwd())
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+def cold_start(script, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", FIRST_FRAME, script, "--no-scores"], cwd=HERE,
+                             capture_output=True, text=True, timeout=120)
+        if "first frame" not in out.stdout:
+            raise RuntimeError(f"{script} exited before its first frame:\n{out.stderr}")
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def suite_cold_start(opts):
+    return {f"{name}.cold_start_ms": metric(cold_start(name + ".py", opts.runs), "ms", "lower")
+            for name in ("juicy_time", "harika")}
+
+# ----------- Runner -------------
+def run_suite(name, opts):
+    """Run one suite in a fresh interpreter and return its metrics."""
+    args = [sys.executable, os.path.abspath(__file__), "--suite=" + name,
+            f"--frames={opts.frames}", f"--calls={opts.calls}", f"--games={opts.games}",
+            f"--runs={opts.runs}", f"--video={opts.video}", f"--video-frames={opts.video_frames}"]
+    out = subprocess.run(args, cwd=HERE, capture_output=True, text=True)
+    sys.stderr.write(out.stderr)
+    if out.returncode != 0:
+        raise RuntimeError(f"benchmark suite {name} failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def compare(metrics, baseline, threshold, overrides):
+    """Annotate metrics with their change from baseline; return the regressions."""
+    regressions = []
+    for name, m in metrics.items():
+        base = baseline.get(name)
+        if not base or not base["value"]: continue
+        change = (m["value"] - base["value"]) / base["value"]
+        worse = -change if m["better"] == "higher" else change
+        limit = overrides.get(name, threshold)
+        m["baseline"] = base["value"]
+        m["change"] = round(change, 4)
+        m["threshold"] = limit
+        m["regressed"] = worse > limit
+        if m["regressed"]: regressions.append(name)
+    return regressions
+
+def parse_args(argv):
+    p = argparse.ArgumentParser(description="Headless benchmarks for the game scripts.")
+    p.add_argument("--suite", help="run a single suite in this process (used internally)")
+    p.add_argument("--only", default=",".join(SUITES), help="comma-separated suites to run")
+    p.add_argument("--frames", type=int, default=1200, help="gameplay frames")
+    p.add_argument("--calls", type=int, default=4000, help="text draw calls per measurement")
+    p.add_argument("--games", type=int, default=300, help="simulated games")
+    p.add_argument("--runs", type=int, default=5, help="cold start runs (median is reported)")
+    p.add_argument("--video", default="starting.mp4")
+    p.add_argument("--video-frames", type=int, default=300)
+    p.add_argument("--baseline", default=BASELINE)
+    p.add_argument("--save-baseline", action="store_true")
+    p.add_argument("--out", help="also write the results JSON here")
+    p.add_argument("--threshold", type=float, default=0.15,
+                   help="allowed fraction worse than baseline before a metric regresses")
+    p.add_argument("--threshold-for", action="append", default=[], metavar="METRIC=FRACTION",
+                   help="per-metric threshold, may be repeated")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    opts = parse_args(argv)
+    if opts.suite:
+        print(json.dumps(globals()["suite_" + opts.suite](opts)))
+        return 0
+
+    metrics = {}
+    for name in opts.only.split(","):
+        metrics.update(run_suite(name, opts))
+
+    baseline = {}
+    if os.path.exists(opts.baseline):
+        with open(opts.baseline) as f:
+            baseline = json.load(f)["metrics"]
+    overrides = {}
+    for item in opts.threshold_for:
+        name, _, value = item.partition("=")
+        overrides[name] = float(value)
+    regressions = compare(metrics, baseline, opts.threshold, overrides)
+
+    results = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": metrics,
+        "regressions": regressions,
+    }
+    text = json.dumps(results, indent=1)
+    print(text)
+    if opts.out:
+        with open(opts.out, "w") as f:
+            f.write(text)
+    if opts.save_baseline:
+        with open(opts.baseline, "w") as f:
+            json.dump({k: v for k, v in results.items() if k != "regressions"}, f, indent=1)
+
+    for name in regressions:
+        m = metrics[name]
+        print(f"REGRESSION {name}: {m['value']} {m['unit']} vs baseline {m['baseline']} "
+              f"({m['change']:+.1%}, threshold {m['threshold']:.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+from operator import itemgetter
+import pygame
+
+def blit_all(target, seq):
+    """Blit (surface, pos) pairs in one call: Surface.fblits where pygame
+    has it, else blits()."""
+    fblits = getattr(target, "fblits", None)
+    if fblits: fblits(seq)
+    else: target.blits(seq, doreturn=False)
+
+# Draw layers, bottom to top. Items in one layer keep submission order.
+SPRITES, LABELS, EFFECTS, HUD, OVERLAY = range(5)
+
+# ----------- Dirty-Rect Renderer -------------
+class DirtyRenderer:
+    """Retained-mode renderer that only repaints regions that changed.
+
+    Game code submits keyed items (a surface, where it goes and a layer)
+    every frame. Items whose surface and position match last frame are
+    left alone; moved, changed or removed items have their old area
+    restored from the background and their new area drawn, and only those
+    rects are passed to pygame.display.update(). With enabled=False every
+    frame is a full background blit plus pygame.display.flip().
+
+    A batch (draw_batch) is many surfaces under one key, such as particles;
+    it is repainted every frame.
+
+    Nothing is drawn at submission. present() sorts what has to be drawn
+    by layer and hands it to one blits()/fblits() call, after one call
+    restoring the background, so a frame costs three draw calls (restore,
+    blit, update) however many items it has. stats() reports the calls
+    and blits per frame.
+    """
+
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.size = screen.get_size()
+        self.background = None
+        self.items = {}       # key -> (surface, rect, layer) presented last frame
+        self.pending = {}     # key -> (surface, rect, layer) submitted this frame
+        self.extra = []       # background areas changed this frame
+        self.full_redraw = True
+        self.frames = 0
+        self.full_frames = 0
+        self.pixels = 0
+        self.calls = 0        # draw calls issued to pygame
+        self.max_calls = 0
+        self.blitted = 0      # surfaces blitted
+        self.submitted = 0    # items submitted
+
+    def set_background(self, surf, dirty=None):
+        """Use surf as the background; dirty lists the areas that differ
+        from the previous background (None repaints everything). A
+        background updated in place is passed again with its dirty areas."""
+        if surf is not self.background and (dirty is None or self.background is None):
+            self.full_redraw = True
+        elif dirty:
+            self.extra.extend(pygame.Rect(r) for r in dirty)
+        self.background = surf
+
+    def invalidate(self):
+        """Force the next present to repaint and flip the whole screen."""
+        self.full_redraw = True
+
+    def draw(self, key, surf, pos, layer=SPRITES):
+        """Submit surf at pos (a point or Rect) under key for this frame."""
+        rect = surf.get_rect(topleft=pos) if not isinstance(pos, pygame.Rect) else pygame.Rect(pos)
+        self.pending[key] = (surf, rect, layer)
+        return rect
+
+    def draw_batch(self, key, seq, rects, layer=EFFECTS):
+        """Submit (surface, pos) pairs under key for this frame; rects are
+        the screen areas they cover."""
+        self.pending[key] = (seq, rects, layer)
+
+    def _restore(self, rects):
+        if self.background is not None:
+            self.screen.blits([(self.background, r, r) for r in rects], doreturn=False)
+            return 1
+        for r in rects: self.screen.fill((255, 255, 255), r)
+        return len(rects)
+
+    def _flush(self, entries):
+        """Blit (surface, rect, layer) entries, bottom layer first, in one call."""
+        seq = []
+        for surf, rect, _ in sorted(entries, key=itemgetter(2)):
+            if isinstance(surf, list): seq.extend(surf)
+            else: seq.append((surf, rect))
+        if not seq: return 0
+        blit_all(self.screen, seq)
+        self.blitted += len(seq)
+        return 1
+
+    def _dirty(self, screen_rect):
+        """(dirty rects, their area, keys of pending entries that changed),
+        or None as soon as the area reaches the screen's."""
+        area = screen_rect.w * screen_rect.h
+        clip = screen_rect.clip
+        dirty, total, changed = [], 0, set()
+        items, pending = self.items, self.pending
+        # Every rect that has to be repainted: background changes, then the
+        # old and new places of batches and of moved, changed or removed items
+        rects = [self.extra]
+        for key, (surf, rect, _) in pending.items():
+            old = items.get(key)
+            if old is not None and old[0] is surf and old[1] == rect and not isinstance(surf, list):
+                continue
+            changed.add(key)
+            rects.append(rect if isinstance(surf, list) else (rect,))
+            if old is not None: rects.append(old[1] if isinstance(old[0], list) else (old[1],))
+        for key in items.keys() - pending.keys():
+            surf, rect, _ = items[key]
+            rects.append(rect if isinstance(surf, list) else (rect,))
+        for group in rects:
+            for r in group:
+                r = clip(r)
+                if r.w and r.h:
+                    dirty.append(r)
+                    total += r.w * r.h
+                    if total >= area: return None
+        return dirty, total, changed
+
+    def _overlapping(self, dirty, total, redraw, screen_rect):
+        """Entries to redraw (redraw holds the keys of changed ones), or
+        None once dirty covers the screen area and a full flip is cheaper.
+
+        An unchanged item is blitted whole, so when it overlaps dirty its
+        whole rect joins dirty (and is restored first), or its alpha edges
+        would blend over themselves. That can reach further items, so each
+        pass checks the items left against the rects the last pass added.
+        """
+        area = screen_rect.w * screen_rect.h
+        rest = [(k, e[1]) for k, e in self.pending.items() if k not in redraw]
+        new = dirty
+        while new and rest:
+            added, keep = [], []
+            for key, rect in rest:
+                if rect.collidelist(new) == -1:
+                    keep.append((key, rect))
+                    continue
+                redraw.add(key)
+                r = screen_rect.clip(rect)
+                added.append(r)
+                total += r.w * r.h
+                if total >= area: return None
+            dirty.extend(added)
+            rest, new = keep, added
+        return [e for k, e in self.pending.items() if k in redraw]
+
+    def present(self):
+        self.frames += 1
+        self.submitted += len(self.pending)
+        screen_rect = self.screen.get_rect()
+        area = screen_rect.w * screen_rect.h
+        dirty = None
+        calls = 0
+        if self.enabled and not self.full_redraw:
+            # Overlapping rects covering more than the screen (a big particle
+            # burst) cost more to repaint one by one than a single flip, so
+            # both stop as soon as the dirty area gets there
+            found = self._dirty(screen_rect)
+            if found is not None:
+                dirty, total, changed = found
+                redraw = self._overlapping(dirty, total, changed, screen_rect)
+                if redraw is None: dirty = None
+        if dirty is None:
+            calls += self._restore([screen_rect])
+            calls += self._flush(self.pending.values())
+            pygame.display.flip()
+            calls += 1
+            self.full_frames += 1
+            self.pixels += area
+            self.full_redraw = False
+        elif dirty:
+            calls += self._restore(dirty)
+            calls += self._flush(redraw)
+            pygame.display.update(dirty)
+            calls += 1
+            self.pixels += sum(r.w * r.h for r in dirty)
+        self.calls += calls
+        self.max_calls = max(self.max_calls, calls)
+        self.items = self.pending
+        self.pending = {}
+        self.extra = []
+
+    def stats(self):
+        w, h = self.size
+        n = self.frames or 1
+        return {
+            "frames": self.frames,
+            "full_frames": self.full_frames,
+            "avg_pixels_per_frame": self.pixels / n,
+            "screen_pixels": w * h,
+            "draw_calls_per_frame": self.calls / n,
+            "max_draw_calls": self.max_calls,
+            "blits_per_frame": self.blitted / n,
+            "items_per_frame": self.submitted / n,
+        }
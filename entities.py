@@ -0,0 +1,102 @@
+import numpy as np
+
+# ----------- Fruit Entity Store -------------
+FREE, FALLING, CUT = 0, 1, 2
+
+class FruitStore:
+    """Many falling fruits kept as parallel NumPy arrays.
+
+    Slot i of every array belongs to one fruit. Movement, off-screen miss
+    detection and removal run as whole-array operations, and freed slots go
+    back on a free list for the next spawn, so there are no per-fruit
+    Python objects.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.x = np.zeros(0, np.float32)
+        self.y = np.zeros(0, np.float32)
+        self.prev_y = np.zeros(0, np.float32)
+        self.vy = np.zeros(0, np.float32)
+        self.anim = np.zeros(0, np.float32)
+        self.letter = np.zeros(0, np.uint8)   # 0..25 for A..Z
+        self.kind = np.zeros(0, np.int16)     # index into the fruit type list
+        self.state = np.zeros(0, np.uint8)
+        self.free = []
+        self.missed = np.zeros(0, np.intp)
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        old = self.capacity
+        for name in ("x", "y", "prev_y", "vy", "anim", "letter", "kind", "state"):
+            arr = getattr(self, name)
+            new = np.zeros(capacity, arr.dtype)
+            new[:old] = arr
+            setattr(self, name, new)
+        # Pop from the end, so lower slots are reused first
+        self.free.extend(range(capacity-1, old-1, -1))
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def clear(self):
+        self.state[:] = FREE
+        self.free = list(range(self.capacity-1, -1, -1))
+
+    def spawn(self, kind, x, y, vy, letter):
+        if not self.free:
+            self._grow(self.capacity * 2)
+        i = self.free.pop()
+        self.x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vy[i] = vy
+        self.anim[i] = 0
+        self.letter[i] = ord(letter) - 65
+        self.kind[i] = kind
+        self.state[i] = FALLING
+        return i
+
+    def update(self, dt, bottom, rise_speed):
+        """Move every fruit by dt; return kind indices of fruits that fell
+        past bottom (their slots are left in self.missed). Missed fruits
+        and finished cut animations are freed."""
+        st = self.state
+        falling = st == FALLING
+        cut = st == CUT
+        if dt: self.prev_y[:] = self.y     # not on a zero step (see game_core.step)
+        self.y[falling] += self.vy[falling] * dt
+        self.y[cut] -= rise_speed * dt
+        self.anim[cut] -= dt
+
+        missed = self.missed = np.flatnonzero(falling & (self.y > bottom))
+        done = np.flatnonzero(cut & (self.anim <= 1e-6))
+        gone = np.concatenate((missed, done))
+        if gone.size:
+            st[gone] = FREE
+            self.free.extend(gone[::-1].tolist())
+        return self.kind[missed]
+
+    def find_letter(self, letter):
+        """Slot of the lowest falling fruit showing letter, or -1."""
+        code = ord(letter) - 65
+        if not 0 <= code < 26:
+            return -1
+        hits = np.flatnonzero((self.state == FALLING) & (self.letter == code))
+        if not hits.size:
+            return -1
+        return int(hits[np.argmax(self.y[hits])])
+
+    def cut(self, i, anim_time):
+        self.state[i] = CUT
+        self.anim[i] = anim_time
+
+    def lerp_y(self, idx, alpha):
+        """y of the given slots interpolated between the last two updates."""
+        return self.prev_y[idx] + (self.y[idx] - self.prev_y[idx]) * alpha
+
+    def active(self):
+        return np.flatnonzero(self.state != FREE)
+
+    def falling_count(self):
+        return int(np.count_nonzero(self.state == FALLING))
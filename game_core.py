@@ -0,0 +1,579 @@
+"""Headless rules for the fruit slash typing game.
+
+Nothing here imports pygame or touches the display, so the game can be
+stepped thousands of times per second for tuning and testing. The game
+scripts own drawing, sound and menus and call step() once per frame.
+
+Level rules come from the campaign files in levels/ (see Campaign).
+"""
+import itertools
+import json
+import os
+import random
+import string
+
+# ----------- Board -------------
+WIDTH, HEIGHT = 900, 600
+FRUIT_TYPES = ["Apple", "Banana", "Mango", "Grape", "Orange", "Strawberry"]
+BOARD_FRUITS = FRUIT_TYPES[:5]
+box_width = 120
+box_height = 150
+box_gap = 20
+
+# ----------- Rules -------------
+TICK = 1/60             # s, fixed simulation step
+TIME_LIMIT = 50         # seconds per level, unless the level says otherwise
+MAX_MISSES = 3
+FRUIT_SPEED = 300       # px/s, the old 5 px per frame at 60 FPS
+CUT_ANIM_TIME = 10/60   # s, the old 10-frame cut animation
+CUT_RISE_SPEED = 120    # px/s, the old 2 px per frame rise while cut
+
+def make_boxes(fruits=BOARD_FRUITS):
+    start_x = (WIDTH - (box_width*len(fruits) + box_gap*(len(fruits)-1)))//2
+    return [{"fruit": name,
+             "x": start_x + i*(box_width+box_gap),
+             "y": HEIGHT - box_height - 60,
+             "fill": 0} for i, name in enumerate(fruits)]
+
+class Board:
+    """The boxes, indexed so that no update depends on the board's size.
+
+    boxes is the list of box dicts the game scripts draw. index maps a
+    fruit type to its box number; open lists the boxes still being filled
+    (a full box is swapped with the last entry and popped) and pos is each
+    box's place in it; completed counts full boxes for the win check.
+    dirty collects the boxes whose fill changed since take_dirty(), and
+    serial changes whenever every box needs redrawing.
+    """
+
+    _serials = itertools.count()
+
+    def __init__(self, fruits):
+        self.boxes = make_boxes(fruits)
+        self.fruits = list(fruits)
+        self.index = {name: i for i, name in enumerate(self.fruits)}
+        self.reset(1)
+
+    def reset(self, target):
+        self.target = target
+        n = len(self.boxes)
+        self.cuts = [0] * n
+        self.open = list(range(n))
+        self.pos = list(range(n))
+        self.completed = 0
+        self.dirty = set()
+        self.serial = next(self._serials)
+        for b in self.boxes: b["fill"] = 0
+
+    def add(self, i):
+        """One more fruit into box i; True if that filled it."""
+        self.cuts[i] += 1
+        if self.pos[i] < 0: return False
+        self.boxes[i]["fill"] = min(1, self.cuts[i] / self.target)
+        self.dirty.add(i)
+        if self.cuts[i] < self.target: return False
+        # Swap-remove from the open list
+        p, last = self.pos[i], self.open[-1]
+        self.open[p] = last
+        self.pos[last] = p
+        self.open.pop()
+        self.pos[i] = -1
+        self.completed += 1
+        return True
+
+    def pick(self, u):
+        """Open box for u in [0, 1), or -1 when every box is full."""
+        if not self.open: return -1
+        return self.open[int(u * len(self.open))]
+
+    @property
+    def full(self):
+        return self.completed == len(self.boxes)
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+# ----------- Levels -------------
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+RUSH_SPEED_RANGE = (0.5, 1.3)   # rush fruits fall at a random fraction of the level speed
+
+class Level:
+    """One level's rules, compiled into ready-made spawn schedules.
+
+    A schedule is the list of every spawn the level can need, each a
+    (pick, x, letter, rush speed scale) tuple; pick in [0, 1) chooses among
+    the boxes still open at spawn time. Every fruit ends up cut into a box,
+    missed, or still falling when the level ends, so a schedule is sized
+    to cover a whole level (rush mode can, rarely, wrap around it).
+    schedule(key) builds the one for a key a game draws from its own RNG,
+    so every seed gets its own spawns; the last CACHE built are kept for
+    games that draw the same key again (a replay, a retry). The speed
+    curve, a list of [seconds, px/s] points, is sampled into a table
+    every 0.1 s.
+    """
+
+    SPEED_STEP = 0.1
+    CACHE = 64
+
+    def __init__(self, number, data, seed):
+        self.number = number
+        self.seed = seed
+        self.fill_target = data["fill_target"]
+        self.time_limit = data.get("time_limit", TIME_LIMIT)
+        self.max_misses = data.get("max_misses", MAX_MISSES)
+        self.fruits = list(data.get("fruits", BOARD_FRUITS))
+        self.letters = data.get("letters", string.ascii_uppercase).upper()
+        unknown = set(self.fruits) - set(FRUIT_TYPES)
+        if unknown:
+            raise ValueError(f"level {number}: unknown fruits {sorted(unknown)}")
+        unknown = set(self.letters) - set(string.ascii_uppercase)
+        if unknown:
+            raise ValueError(f"level {number}: letters must be A-Z, not {sorted(unknown)}")
+        if not self.letters:
+            raise ValueError(f"level {number}: no letters")
+
+        curve = sorted(data.get("speed", [[0, FRUIT_SPEED]]))
+        steps = int(self.time_limit / self.SPEED_STEP) + 1
+        self.speed_table = [_interpolate(curve, i * self.SPEED_STEP) for i in range(steps)]
+
+        self.spawns = (self.fill_target * len(self.fruits)
+                       + max(self.max_misses, RUSH_MAX_MISSES) + RUSH_MAX_ACTIVE)
+        self.schedules = {}   # key -> schedule, oldest first
+
+    def schedule(self, key):
+        """The spawn schedule for key, built on first use."""
+        schedule = self.schedules.get(key)
+        if schedule is None:
+            if len(self.schedules) >= self.CACHE:
+                del self.schedules[next(iter(self.schedules))]
+            rng = random.Random(f"{self.seed}:{self.number}:{key}")
+            schedule = self.schedules[key] = [
+                (rng.random(), rng.randint(50, WIDTH-100),
+                 rng.choice(self.letters), rng.uniform(*RUSH_SPEED_RANGE))
+                for _ in range(self.spawns)]
+        return schedule
+
+    def speed_at(self, elapsed):
+        table = self.speed_table
+        return table[min(len(table) - 1, int(elapsed / self.SPEED_STEP))]
+
+def _interpolate(curve, t):
+    if t <= curve[0][0]: return curve[0][1]
+    for (t0, v0), (t1, v1) in zip(curve, curve[1:]):
+        if t <= t1:
+            return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+    return curve[-1][1]
+
+class Campaign:
+    """A list of levels read from levels/<name>.json.
+
+    Every level starts from the file's "defaults" and overrides what it
+    needs. After the last level, "after_last" is "repeat" (keep playing
+    the last level's rules) or "win" (beating it wins the game). Levels
+    are compiled the first time they are asked for.
+    """
+
+    def __init__(self, name, data):
+        self.name = name
+        self.after_last = data.get("after_last", "repeat")
+        defaults = data.get("defaults", {})
+        self.data = [dict(defaults, **level) for level in data["levels"]]
+        self.compiled = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def level(self, number):
+        i = min(max(number, 1), len(self.data)) - 1
+        if i not in self.compiled:
+            self.compiled[i] = Level(i + 1, self.data[i], self.name)
+        return self.compiled[i]
+
+    def is_last(self, number):
+        return self.after_last == "win" and number >= len(self.data)
+
+    @property
+    def last_level(self):
+        """The highest level a player can reach, or None if the last one repeats."""
+        return len(self.data) if self.after_last == "win" else None
+
+_campaigns = {}   # path -> (mtime, Campaign)
+
+def load_campaign(name="juicy_time", directory=LEVEL_DIR):
+    """The named campaign, re-read only when its file changes."""
+    path = os.path.join(directory, name + ".json")
+    mtime = os.stat(path).st_mtime
+    cached = _campaigns.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path) as f:
+        campaign = Campaign(name, json.load(f))
+    _campaigns[path] = (mtime, campaign)
+    return campaign
+
+# ----------- State -------------
+class GameState:
+    """Everything one game needs; step() advances it."""
+
+    max_misses = MAX_MISSES
+
+    def __init__(self, level=1, seed=None, campaign=None):
+        self.rng = random.Random(seed)
+        self.campaign = campaign or load_campaign()
+        self.board = None
+        self.reset(level)
+
+    def reset(self, level=None):
+        if level is not None:
+            self.level = level
+        rules = self.rules = self.campaign.level(self.level)
+        if self.board is None or self.board.fruits != rules.fruits:
+            self.board = Board(rules.fruits)
+        self.board.reset(rules.fill_target)
+        self.boxes = self.board.boxes
+        self.max_misses = rules.max_misses
+        self.schedule = rules.schedule(self.rng.getrandbits(32))
+        self.spawns = 0
+        self.score = 0
+        self.timer = rules.time_limit
+        self.elapsed = 0.0
+        self.fruit = None
+        self.game_over = False
+        self.game_win = False
+        self.missed = 0
+        self.lose_reason = ""
+        self.fruits_to_fill = rules.fill_target
+        self.pending = []     # events raised outside step(), returned by the next one
+        if spawn_fruit(self): self.pending.append(("spawn", self.fruit["type"]))
+
+    @property
+    def finished(self):
+        return self.game_over or self.game_win
+
+def next_spawn(state):
+    """The next (pick, x, letter, rush speed scale) from the level's schedule."""
+    spawn = state.schedule[state.spawns % len(state.schedule)]
+    state.spawns += 1
+    return spawn
+
+def spawn_fruit(state):
+    if state.board.full:
+        state.fruit = None
+        return None
+    pick, x, letter, _ = next_spawn(state)
+    state.fruit = {
+        "type": state.board.fruits[state.board.pick(pick)],
+        "x": x,
+        "y": -80,
+        "prev_y": -80,
+        "speed": state.rules.speed_at(state.elapsed),
+        "letter": letter,
+        "cut": False,
+        "cut_anim": 0
+    }
+    return state.fruit
+
+# ----------- Step -------------
+def handle_key(state, key, events):
+    """Apply one typed character, as the KEYDOWN handler did."""
+    key = key.upper()
+    fruit = state.fruit
+    if fruit and not fruit["cut"] and fruit["letter"] == key:
+        fruit["cut"] = True
+        fruit["cut_anim"] = CUT_ANIM_TIME
+        state.score += 1
+        events.append(("cut", (fruit["type"], fruit["x"], fruit["y"])))
+        if state.board.add(state.board.index[fruit["type"]]):
+            events.append(("fill", fruit["type"]))
+    elif fruit:
+        state.game_over = True
+        state.lose_reason = "Wrong key pressed!"
+        events.append(("wrong_key", key))
+
+def step(state, inputs, dt):
+    """Advance state by dt seconds after applying typed characters.
+
+    Returns a list of (kind, detail) events for the caller to turn into
+    sound, popups and screens: cut, fill (a box just filled), wrong_key,
+    miss, spawn, game_over, win.
+    A cut's detail is (fruit type, x, y), the fruit's top-left corner.
+    The spawn of a level's first fruit, made by reset(), comes with the
+    first step after it.
+    """
+    if isinstance(state, WordState):
+        return step_words(state, inputs, dt)
+    if isinstance(state, RushState):
+        return step_rush(state, inputs, dt)
+    events, state.pending = state.pending, []
+    if not state.finished:
+        for key in inputs:
+            if state.finished: break
+            handle_key(state, key, events)
+
+    # Timer
+    if not state.finished:
+        state.elapsed += dt
+        state.timer = state.rules.time_limit - int(state.elapsed)
+        if state.timer <= 0:
+            state.game_over = True
+            state.lose_reason = "Time's up!"
+
+    # Update fruit
+    fruit = state.fruit
+    if fruit:
+        # A zero step (keys between ticks) must not move the interpolation
+        # start, or the drawn fruit jumps ahead by up to a tick
+        if dt: fruit["prev_y"] = fruit["y"]
+        if not fruit["cut"]:
+            fruit["y"] += fruit["speed"] * dt
+            if fruit["y"] > HEIGHT:
+                state.missed += 1
+                events.append(("miss", fruit["type"]))
+                if state.missed >= state.max_misses:
+                    state.game_over = True
+                    state.lose_reason = "Too many fruits missed!"
+                state.fruit = None
+        elif fruit["cut_anim"] > 1e-9:
+            fruit["cut_anim"] -= dt
+            fruit["y"] -= CUT_RISE_SPEED * dt
+        else:
+            state.fruit = None
+
+    # Spawn next fruit
+    if not state.fruit and not state.finished:
+        if spawn_fruit(state):
+            events.append(("spawn", state.fruit["type"]))
+
+    # Win / lose
+    if not state.finished and state.board.full:
+        state.game_win = True
+        events.append(("win", state.level))
+    if state.game_over and not any(e[0] == "game_over" for e in events):
+        events.append(("game_over", state.lose_reason))
+    return events
+
+# ----------- Rush Mode -------------
+RUSH_SPAWN_INTERVAL = 0.35   # s between spawns
+RUSH_MAX_ACTIVE = 40         # falling fruits on screen at once
+RUSH_MAX_MISSES = 10
+
+class RushState(GameState):
+    """Many fruits at once, each with its own letter, speed and cut
+    animation, kept in a NumPy FruitStore instead of one fruit dict."""
+
+    def __init__(self, level=1, seed=None, campaign=None, max_active=RUSH_MAX_ACTIVE,
+                 spawn_interval=RUSH_SPAWN_INTERVAL, max_misses=RUSH_MAX_MISSES):
+        from entities import FruitStore
+        self.store = FruitStore(max(64, max_active))
+        self.max_active = max_active
+        self.spawn_interval = spawn_interval
+        self.rush_max_misses = max_misses
+        super().__init__(level, seed, campaign)
+
+    def reset(self, level=None):
+        self.store.clear()
+        self.spawn_clock = self.spawn_interval
+        super().reset(level)
+        self.max_misses = self.rush_max_misses
+        self.fruit = None
+        self.pending = []
+        self.types = [b["fruit"] for b in self.boxes]
+
+    def forget(self, slots):
+        """Called with the store slots of fruits that were just missed."""
+
+def spawn_rush_fruit(state):
+    if state.board.full:
+        return -1
+    pick, x, letter, scale = next_spawn(state)
+    return state.store.spawn(state.board.pick(pick), x, -80,
+                             state.rules.speed_at(state.elapsed) * scale, letter)
+
+def step_rush(state, inputs, dt):
+    """step() for RushState: a typed letter cuts the lowest fruit showing it."""
+    events, state.pending = state.pending, []
+    store = state.store
+    for key in inputs:
+        if state.finished: break
+        key = key.upper()
+        i = store.find_letter(key) if len(key) == 1 else -1
+        if i < 0:
+            if store.falling_count():
+                state.game_over = True
+                state.lose_reason = "Wrong key pressed!"
+                events.append(("wrong_key", key))
+            continue
+        store.cut(i, CUT_ANIM_TIME)
+        k = int(store.kind[i])
+        state.score += 1
+        events.append(("cut", (state.types[k], float(store.x[i]), float(store.y[i]))))
+        if state.board.add(k): events.append(("fill", state.types[k]))
+    return advance_rush(state, events, dt)
+
+def advance_rush(state, events, dt, spawn=spawn_rush_fruit):
+    """The part of a rush step after input: timer, movement, spawns, win."""
+    store = state.store
+    if not state.finished:
+        state.elapsed += dt
+        state.timer = state.rules.time_limit - int(state.elapsed)
+        if state.timer <= 0:
+            state.game_over = True
+            state.lose_reason = "Time's up!"
+
+    missed = store.update(dt, HEIGHT, CUT_RISE_SPEED)
+    state.forget(store.missed)
+    if missed.size and not state.finished:
+        state.missed += int(missed.size)
+        events.extend(("miss", state.types[k]) for k in missed.tolist())
+        if state.missed >= state.max_misses:
+            state.game_over = True
+            state.lose_reason = "Too many fruits missed!"
+
+    if not state.finished:
+        state.spawn_clock += dt
+        while state.spawn_clock >= state.spawn_interval:
+            state.spawn_clock -= state.spawn_interval
+            if store.falling_count() >= state.max_active: continue
+            i = spawn(state)
+            if i >= 0: events.append(("spawn", state.types[store.kind[i]]))
+
+        if state.board.full:
+            state.game_win = True
+            events.append(("win", state.level))
+    if state.game_over and not any(e[0] == "game_over" for e in events):
+        events.append(("game_over", state.lose_reason))
+    return events
+
+# ----------- Word Mode -------------
+WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt")
+
+class WordState(RushState):
+    """Rush mode with a whole word on every fruit, typed a letter at a time.
+
+    The words on screen are indexed in a words.WordTrie, so each key only
+    follows one link from the current prefix. A key no word continues
+    drops the prefix and starts over from that key if some word begins
+    with it; only a key that neither continues nor begins a word is a
+    typo, which is counted but does not end the game. Words get longer
+    each level (max_word + level letters).
+    """
+
+    def __init__(self, dictionary=None, level=1, seed=None, campaign=None, max_word=4, **kw):
+        from words import Dictionary
+        self.dictionary = dictionary or Dictionary(WORDS_FILE, fallback=FRUIT_TYPES)
+        self.max_word = max_word
+        super().__init__(level, seed, campaign, **kw)
+
+    def reset(self, level=None):
+        from words import WordTrie
+        super().reset(level)
+        self.trie = WordTrie()
+        self.words = {}       # store slot -> word
+        self.typos = 0
+
+    def forget(self, slots):
+        for i in slots.tolist():
+            self.trie.remove(self.words.pop(i), i)
+
+    @property
+    def typed(self):
+        return self.trie.typed
+
+def spawn_word_fruit(state):
+    i = spawn_rush_fruit(state)
+    if i >= 0:
+        word = state.dictionary.pick(state.rng, state.max_word + state.level)
+        state.words[i] = word
+        state.trie.add(word, i)
+    return i
+
+def step_words(state, inputs, dt):
+    """step() for WordState. Extra events: letter (a key that continues a
+    word) and typo."""
+    events, state.pending = state.pending, []
+    store = state.store
+    for key in inputs:
+        if state.finished: break
+        key = key.upper()
+        if len(key) != 1 or not "A" <= key <= "Z": continue
+        result, i = state.trie.type(key)
+        if result == "typo":
+            state.typos += 1
+            events.append(("typo", key))
+        elif result == "letter":
+            events.append(("letter", key))
+        else:
+            state.trie.remove(state.words.pop(i), i)
+            store.cut(i, CUT_ANIM_TIME)
+            k = int(store.kind[i])
+            state.score += 1
+            events.append(("cut", (state.types[k], float(store.x[i]), float(store.y[i]))))
+            if state.board.add(k): events.append(("fill", state.types[k]))
+    return advance_rush(state, events, dt, spawn=spawn_word_fruit)
+
+# ----------- Timestep -------------
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed ticks.
+
+    Frame time goes into an accumulator and ticks() says how many steps of
+    `tick` seconds to simulate, so gameplay is the same at any display rate.
+    alpha is how far the accumulator is into the next tick, for
+    interpolating what is drawn. A single frame counts for at most
+    max_frame seconds so a long stall does not snowball.
+    """
+
+    def __init__(self, tick=TICK, max_frame=0.25):
+        self.tick = tick
+        self.max_frame = max_frame
+        self.accumulator = 0.0
+        self.total_ticks = 0
+
+    def ticks(self, frame_dt):
+        self.accumulator += min(frame_dt, self.max_frame)
+        n = int(self.accumulator / self.tick + 1e-9)
+        self.accumulator -= n * self.tick
+        self.total_ticks += n
+        return n
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.tick
+
+    def reset(self):
+        self.accumulator = 0.0
+
+def lerp_y(fruit, alpha):
+    """Fruit y interpolated between the last two ticks."""
+    return fruit["prev_y"] + (fruit["y"] - fruit["prev_y"]) * alpha
+
+# ----------- Headless Runs -------------
+def typist(accuracy=0.98, reaction=0.4, seed=None):
+    """Simple bot policy: types the falling fruit's letter after a delay."""
+    rng = random.Random(seed)
+    def policy(state):
+        f = state.fruit
+        if not f or f["cut"]: return []
+        if (f["y"] + 80) / f["speed"] < reaction: return []
+        if rng.random() < accuracy: return [f["letter"]]
+        return ["?"]
+    return policy
+
+def simulate(policy, level=1, seed=None, dt=TICK, max_time=TIME_LIMIT+5):
+    """Play one game to the end with policy(state) -> inputs."""
+    state = GameState(level, seed)
+    t = 0.0
+    while not state.finished and t < max_time:
+        step(state, policy(state), dt)
+        t += dt
+    return state
+
+if __name__ == "__main__":
+    import sys, time
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    start = time.perf_counter()
+    wins = 0
+    for seed in range(games):
+        wins += simulate(typist(seed=seed), seed=seed).game_win
+    took = time.perf_counter() - start
+    print(f"{games} games in {took:.2f}s ({games/took:.0f} games/s), win rate {wins/games:.1%}")
@@ -0,0 +1,41 @@
+import time
+import pygame
+
+# Events that mean the window contents may need repainting
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN,
+                 pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED)
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION,
+                pygame.FINGERDOWN, pygame.JOYBUTTONDOWN)
+
+# ----------- Event Waiting -------------
+def wait_events(timeout_ms=1000):
+    """Sleep until an event arrives (or timeout_ms passes) and return all
+    pending events; an empty list means the wait timed out."""
+    event = pygame.event.wait(timeout_ms)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+def needs_redraw(events):
+    return any(e.type in REDRAW_EVENTS for e in events)
+
+# ----------- Idle / Attract Mode -------------
+class IdleMode:
+    """Drops animated screens to a low frame rate after a stretch with no
+    input, and back to full rate on the next key, click or touch."""
+
+    def __init__(self, idle_after=30.0, idle_fps=5):
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.last_input = time.monotonic()
+
+    def note(self, events):
+        if any(e.type in INPUT_EVENTS for e in events):
+            self.last_input = time.monotonic()
+
+    @property
+    def idle(self):
+        return time.monotonic() - self.last_input >= self.idle_after
+
+    def fps(self, active_fps):
+        return self.idle_fps if self.idle else active_fps
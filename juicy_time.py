@@ -1,16 +1,71 @@
+import os
+import sys
+from startup import StartupProfile, BackgroundLoader
 import pygame
 import random
-import sys
-import string
-import cv2
-
-pygame.init()
+import atexit
+import game_core
+from game_core import WIDTH, HEIGHT, box_width, box_height
+from text_cache import text_cache
+from dirty_render import DirtyRenderer, blit_all, LABELS, HUD, OVERLAY
+from layers import compositor, menu_gradient
+from video_intro import VideoDecoder, MediaClock, frame_surface, END
+import asset_bundle
+from idle import IdleMode, needs_redraw
+from scenes import Scene, SceneManager
+from profiler import profiler
+import replay
+from latency import latency, LowLatencyPacer
+from audio import audio
+
+def arg_value(name, default):
+    """Value of a --name=value command-line option, as default's type."""
+    prefix = "--" + name + "="
+    for a in sys.argv:
+        if a.startswith(prefix): return type(default)(a[len(prefix):])
+    return default
+
+# --startup-profile prints how long each startup phase took once the
+# first menu frame is on screen
+profile = StartupProfile(enabled="--startup-profile" in sys.argv)
+profile.mark("imports")
+
+# Assets the menu does not need are loaded here while it is showing
+loader = BackgroundLoader()
 
 # ----------- Window -------------
-WIDTH, HEIGHT = 900, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Fruit Slash Typing Game")
-clock = pygame.time.Clock()
+# Opened by init(), so importing this module has no side effects
+screen = None
+clock = None
+renderer = None
+
+# Dirty-rect rendering: repaint only what changed. Pass --full-flip to
+# redraw and flip the whole window every frame instead.
+USE_DIRTY_RECTS = "--full-flip" not in sys.argv
+
+# Everything is drawn at WIDTH x HEIGHT. --scaled lets SDL stretch that to
+# a larger window and --fullscreen to the whole display, on the GPU when
+# it presents; --scale-filter picks nearest, linear or best.
+FULLSCREEN = "--fullscreen" in sys.argv
+SCALED = FULLSCREEN or "--scaled" in sys.argv
+SCALE_FILTERS = ("nearest", "linear", "best")
+
+def open_window(size):
+    """The display surface, size pixels whatever the window's real size."""
+    flags = 0
+    if SCALED:
+        if hasattr(pygame, "SCALED"):
+            scale_filter = arg_value("scale-filter", "linear")
+            if scale_filter not in SCALE_FILTERS:
+                print(f"Warning: Unknown scale filter {scale_filter}, using linear.")
+                scale_filter = "linear"
+            # Read by SDL when the scaled renderer is created
+            os.environ["SDL_RENDER_SCALE_QUALITY"] = scale_filter
+            flags |= pygame.SCALED
+        else:
+            print("Warning: This pygame cannot scale the window; opening it unscaled.")
+    if FULLSCREEN: flags |= pygame.FULLSCREEN
+    return pygame.display.set_mode(size, flags)
 
 # ----------- Colors -------------
 WHITE = (255, 255, 255)
@@ -23,19 +78,31 @@ YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 GRAY = (180,180,180)
 
-# ----------- Fonts --------------
-font = pygame.font.SysFont("arial", 28)
-big_font = pygame.font.SysFont("arial", 48)
-
 # ----------- Sounds -------------
-try: cut_sound = pygame.mixer.Sound("cut.wav")
-except: cut_sound = None
-try: fill_sound = pygame.mixer.Sound("fill.wav")
-except: fill_sound = None
-try: win_sound = pygame.mixer.Sound("win.wav")
-except: win_sound = None
-try: lose_sound = pygame.mixer.Sound("lose.wav")
-except: lose_sound = None
+# name -> (file, channel category)
+SOUNDS = {"cut": ("cut.wav", "cut"), "fill": ("fill.wav", "fill"),
+          "win": ("win.wav", "jingle"), "lose": ("lose.wav", "jingle")}
+
+def load_sound(name):
+    try: return pygame.mixer.Sound(name)
+    except: return None
+
+def finish_loading():
+    """Put the sounds loaded in the background into the bank, waiting if needed."""
+    for name, (file, category) in SOUNDS.items():
+        if name not in audio.bank:
+            audio.add(name, loader.get(file), category)
+    if WORDS: loader.get("words")
+    global resume
+    if resume is not None:
+        try: state.level = max(state.level, resume.result())
+        except: pass
+        # Progress saved before it was capped can point past the last level
+        last = state.campaign.last_level
+        if last is not None: state.level = min(state.level, last)
+        resume = None
+    if particles is None and PARTICLES > 0:
+        make_particles()
 
 # ----------- Images -------------
 def load_image(name, color, size=(70,70)):
@@ -47,423 +114,686 @@ def load_image(name, color, size=(70,70)):
         pygame.draw.circle(surf, color, (size[0]//2, size[1]//2), size[0]//2)
         return surf
 
-fruit_images = {
-    "Apple": load_image("apple.png", RED),
-    "Banana": load_image("banana.png", YELLOW),
-    "Mango": load_image("mango.png", ORANGE),
-    "Grape": load_image("grape.png", PURPLE),
-    "Orange": load_image("orange.png", ORANGE),
-    "Strawberry": load_image("strawberry.png", RED),
+fruit_files = {
+    "Apple": "apple.png", "Banana": "banana.png", "Mango": "mango.png",
+    "Grape": "grape.png", "Orange": "orange.png", "Strawberry": "strawberry.png",
 }
 fruit_colors = {
     "Apple": RED, "Banana": YELLOW, "Mango": ORANGE,
     "Grape": PURPLE, "Orange": ORANGE, "Strawberry": RED,
 }
+fruit_images = {}
+sprites = {}
+
+def sprite_spec():
+    """Every pre-scaled sprite, as packed by asset_bundle."""
+    spec = []
+    for name, file in fruit_files.items():
+        color = fruit_colors[name]
+        spec.append({"key": "fruit/"+name, "file": file, "size": (70,70), "color": color, "fallback": "circle"})
+        spec.append({"key": "icon/"+name, "file": file, "size": (50,50), "via": (70,70), "color": color, "fallback": "circle"})
+    spec.append({"key": "box", "file": "box.png", "size": (120,150), "color": BLUE, "fallback": "rect"})
+    spec.append({"key": "key", "file": "key.png", "size": (60,60), "color": YELLOW, "fallback": "rect"})
+    return spec
+
+def load_sprites():
+    """Sprites from the packed atlas, or decoded one by one if it can't be used."""
+    try:
+        return asset_bundle.load(sprite_spec())
+    except Exception as e:
+        print("Warning: Could not use sprite atlas:", e)
+    out = {}
+    for name, file in fruit_files.items():
+        out["fruit/"+name] = load_image(file, fruit_colors[name])
+        out["icon/"+name] = pygame.transform.scale(out["fruit/"+name], (50, 50))
+    for key, file, size, color in (("box", "box.png", (120,150), BLUE), ("key", "key.png", (60,60), YELLOW)):
+        try: out[key] = pygame.transform.scale(pygame.image.load(file).convert_alpha(), size)
+        except:
+            out[key] = pygame.Surface(size)
+            out[key].fill(color)
+    return out
+
+# ----------- Particles -------------
+# Cut effects, at most --particles=N alive at once (0 turns them off).
+# Built the first time a game starts, so they don't slow the first frame.
+PARTICLES = arg_value("particles", 256)
+particles = None
+
+def make_particles():
+    global particles
+    try:
+        from particles import ParticleSystem
+    except ImportError:
+        print("Warning: Particles need numpy; cut effects are off.")
+        particles = False
+        return
+    particles = ParticleSystem(PARTICLES, (WIDTH, HEIGHT))
+    for name, color in fruit_colors.items():
+        particles.add_fruit(name, fruit_images[name], color)
+
+def init():
+    """Open the window and load what the menu needs; queue the rest."""
+    global screen, clock, renderer
+    audio.pre_init()
+    pygame.init()
+    audio.start()
+    profile.mark("pygame.init")
+    screen = open_window((WIDTH, HEIGHT))
+    pygame.display.set_caption("Fruit Slash Typing Game")
+    clock = pygame.time.Clock()
+    renderer = DirtyRenderer(screen, enabled=USE_DIRTY_RECTS)
+    profile.mark("window")
+
+    for file, _ in SOUNDS.values():
+        loader.submit(file, load_sound, file)
+    if WORDS: loader.submit("words", state.dictionary.load)
+
+    sprites.update(load_sprites())
+    fruit_images.update({name: sprites["fruit/"+name] for name in fruit_files})
+    profile.mark("sprite atlas")
 
 # ----------- Game Variables -----
-FPS = 60
-score = 0
-timer = 50
-fruit_speed = 5
-current_fruit = None
-game_over = False
-game_win = False
-missed = 0
-MAX_MISSES = 3
-start_ticks = pygame.time.get_ticks()
-lose_reason = ""
+# The rules and their state live in game_core; this script draws them.
+# FPS is only the display rate (--fps=N); the rules always run at
+# game_core.TICK and the fruit is interpolated between ticks.
+FPS = arg_value("fps", 60)
+# --rush: dozens of fruits at once (needs numpy)
+# --words: rush with a word on every fruit, from --dictionary=PATH
+WORDS = "--words" in sys.argv
+RUSH = "--rush" in sys.argv or WORDS
+if WORDS:
+    from words import Dictionary
+    state = game_core.WordState(Dictionary(arg_value("dictionary", game_core.WORDS_FILE),
+                                           fallback=game_core.FRUIT_TYPES))
+elif RUSH:
+    state = game_core.RushState()
+else:
+    state = game_core.GameState()
 popup_message = ""
 popup_timer = 0
 POPUP_DURATION = 1000
-LEVEL = 1
-FRUITS_TO_FILL = 5  # Level 1 fill requirement
-
-# Boxes setup for fruit fill
-box_width = 120
-box_height = 150
-box_gap = 20
-fruit_list = list(fruit_images.keys())[:5]
-box_start_x = (WIDTH - (box_width*len(fruit_list) + box_gap*(len(fruit_list)-1)))//2
-boxes = []
-for i, name in enumerate(fruit_list):
-    boxes.append({
-        "fruit": name,
-        "x": box_start_x + i*(box_width+box_gap),
-        "y": HEIGHT - box_height - 60,
-        "fill":0
-    })
+
+# ----------- Scores -------------
+# Results, high scores and level progress go to --scores=PATH (a SQLite
+# file) for --player=NAME; --no-scores turns this off. main() opens it.
+PLAYER = arg_value("player", "player")
+MODE = "words" if WORDS else "rush" if RUSH else "classic"
+SCORES_READY = pygame.event.custom_type()
+scores = None
+session_id = None
+resume = None     # saved level to start from, while it is being read
+
+def save_result():
+    """Store the level that just ended."""
+    if scores:
+        scores.record(session_id, PLAYER, state.campaign.name, MODE, state.level,
+                      state.score, state.game_win, state.lose_reason, state.campaign.last_level)
+
+def leaderboard(level=None):
+    """Future of the top scores; the event wakes a screen waiting for input."""
+    if not scores: return None
+    future = scores.top(state.campaign.name, MODE, level)
+    future.add_done_callback(lambda f: pygame.event.post(pygame.event.Event(SCORES_READY)))
+    return future
+
+# ----------- Telemetry -------------
+# --telemetry logs every game event to compressed files in
+# --telemetry-dir (new file every --telemetry-max-mb); summarise them
+# with python telemetry.py. Replays are not logged again.
+telemetry = None
+
+# Animated screens drop to --idle-fps after --idle-after seconds without
+# input; static screens sleep until an event arrives.
+idle = IdleMode(idle_after=arg_value("idle-after", 30.0), idle_fps=arg_value("idle-fps", 5))
 
 # ----------- Helper Functions ----------
-def draw_text_with_outline(text, size, color, outline_color, x, y, center=True):
-    f = pygame.font.SysFont("arial", size, bold=True)
-    surf = f.render(text, True, color)
-    outline = f.render(text, True, outline_color)
-    rect = surf.get_rect()
-    if center: rect.center = (x,y)
-    else: rect.topleft = (x,y)
-    for dx, dy in [(-2,0),(2,0),(0,-2),(0,2)]:
-        screen.blit(outline, rect.move(dx,dy))
-    screen.blit(surf, rect)
+def draw_text_with_outline(text, size, color, outline_color, x, y, center=True, target=None):
+    # Fonts and outlined surfaces are cached, so repeat labels cost one blit
+    with profiler.phase("text"):
+        return text_cache.draw(target or screen, text, size, color, outline_color, x, y, center)
+
+def queue_text(key, text, size, color, outline_color, x, y, center=True, layer=HUD):
+    """Submit outlined text to the dirty-rect renderer for this frame."""
+    with profiler.phase("text"):
+        surf, rect = text_cache.layout(text, size, color, outline_color, x, y, center)
+        return renderer.draw(key, surf, rect, layer)
+
+def draw_profiler_overlay(target=None):
+    """Blit (or, for the game board, submit) the F3 performance overlay."""
+    if not profiler.overlay: return
+    surf = profiler.overlay_surface()
+    if target is None: renderer.draw("profiler", surf, (10, 90), OVERLAY)
+    else: target.blit(surf, (10, 90))
+
+def read_bytes(name):
+    try:
+        with open(name, "rb") as f: return f.read()
+    except OSError:
+        return None
+
+def play_music(name, volume, loops=0):
+    """Play a music track, from bytes preloaded in the background if ready."""
+    data = loader.get(name) if loader.ready(name) else None
+    return audio.play_music(name, volume, loops, data)
 
 def play_background_music():
     """Play looping background music."""
-    try:
-        pygame.mixer.music.load("game_bg.mp3")
-        pygame.mixer.music.set_volume(0.5)
-        pygame.mixer.music.play(-1)
-    except:
+    if not play_music("game_bg.mp3", 0.5, -1):
         print("Warning: Could not play background music.")
 
 # ----------- Front Page ----------
-def front_page():
-    try:
-        bg_image = pygame.image.load("menu_bg.jpg").convert()
-        bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
-    except:
-        bg_image = None
-
-    play_background_music()
-
-    fruit_icons = []
-    for f_name, img in fruit_images.items():
-        icon = pygame.transform.scale(img, (50, 50))
-        fruit_icons.append({"image": icon,
-                            "x": random.randint(0, WIDTH-50),
-                            "y": random.randint(0, HEIGHT//2),
-                            "speed": random.uniform(0.5, 1.5)})
-
-    running_menu = True
-    while running_menu:
-        screen.fill(WHITE)
-        if bg_image:
-            screen.blit(bg_image, (0,0))
-        else:
-            for i in range(HEIGHT):
-                color = (255 - i//3, 255, 255 - i//3)
-                pygame.draw.line(screen, color, (0,i), (WIDTH,i))
-
-        for icon in fruit_icons:
-            icon["y"] += icon["speed"]
+class MenuScene(Scene):
+    def enter(self):
+        try:
+            bg_image = pygame.image.load("menu_bg.jpg").convert()
+            self.bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
+        except:
+            self.bg_image = None
+
+        play_background_music()
+        profile.mark("menu background + music")
+
+        self.fruit_icons = []
+        for f_name in fruit_images:
+            self.fruit_icons.append({"image": sprites["icon/"+f_name],
+                                     "x": random.randint(0, WIDTH-50),
+                                     "y": random.randint(0, HEIGHT//2),
+                                     "speed": random.uniform(0.5, 1.5)})
+
+        self.start_button = pygame.Rect(WIDTH//2-100, HEIGHT//2, 200, 60)
+        self.quit_button = pygame.Rect(WIDTH//2-100, HEIGHT//2+100, 200, 60)
+
+    def preload(self):
+        # The intro is next: its decoder starts (and imports cv2) once the
+        # first menu frame is on screen, so it does not slow that frame down
+        loader.submit(INTRO_MUSIC, read_bytes, INTRO_MUSIC)
+        self.decoder = VideoDecoder(INTRO_VIDEO, (WIDTH, HEIGHT))
+
+    def start_decoder(self):
+        if self.decoder.ident is None: self.decoder.start()
+
+    def frame_rate(self):
+        return idle.fps(FPS)
+
+    def build_background(self, surf):
+        if self.bg_image: surf.blit(self.bg_image, (0,0))
+        else: surf.blit(menu_gradient((WIDTH, HEIGHT)), (0,0))
+
+    def build_overlay(self, surf):
+        draw_text_with_outline("FRUIT SLASH TYPING GAME", 60, ORANGE, BLACK, WIDTH//2, HEIGHT//4, target=surf)
+        pygame.draw.rect(surf, GREEN, self.start_button, border_radius=10)
+        pygame.draw.rect(surf, RED, self.quit_button, border_radius=10)
+        draw_text_with_outline("START GAME", 36, WHITE, BLACK, self.start_button.centerx, self.start_button.centery, target=surf)
+        draw_text_with_outline("QUIT", 36, WHITE, BLACK, self.quit_button.centerx, self.quit_button.centery, target=surf)
+
+    def handle(self, event):
+        idle.note([event])
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.start_button.collidepoint(event.pos):
+                self.start_decoder()
+                self.manager.switch(VideoScene(self.decoder))
+            elif self.quit_button.collidepoint(event.pos):
+                self.manager.quit()
+
+    def update(self, dt):
+        # Icon speeds are per 60 FPS frame; attract mode runs slower
+        frame_scale = dt * 60 / 1000
+        for icon in self.fruit_icons:
+            icon["y"] += icon["speed"] * frame_scale
             if icon["y"] > HEIGHT:
                 icon["y"] = -50
                 icon["x"] = random.randint(0, WIDTH-50)
-            screen.blit(icon["image"], (icon["x"], icon["y"]))
-
-        draw_text_with_outline("FRUIT SLASH TYPING GAME", 60, ORANGE, BLACK, WIDTH//2, HEIGHT//4)
-        start_button = pygame.Rect(WIDTH//2-100, HEIGHT//2, 200, 60)
-        quit_button = pygame.Rect(WIDTH//2-100, HEIGHT//2+100, 200, 60)
-
-        pygame.draw.rect(screen, GREEN, start_button, border_radius=10)
-        pygame.draw.rect(screen, RED, quit_button, border_radius=10)
 
-        draw_text_with_outline("START GAME", 36, WHITE, BLACK, start_button.centerx, start_button.centery)
-        draw_text_with_outline("QUIT", 36, WHITE, BLACK, quit_button.centerx, quit_button.centery)
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if start_button.collidepoint(event.pos):
-                    running_menu=False
-                elif quit_button.collidepoint(event.pos):
-                    pygame.quit(); sys.exit()
+    def render(self):
+        size = screen.get_size()
+        background = compositor.get("menu_bg", self.bg_image is not None, size, self.build_background)
+        overlay = compositor.get("menu_overlay", None, size, self.build_overlay, alpha=True)
+
+        # One batched call: background, falling icons, then the title and buttons
+        seq = [(background, (0,0))]
+        seq += [(icon["image"], (icon["x"], icon["y"])) for icon in self.fruit_icons]
+        seq.append((overlay, (0,0)))
+        blit_all(screen, seq)
+        draw_profiler_overlay(screen)
+
+        with profiler.phase("present"):
+            pygame.display.flip()
+        if not profile.reported:
+            profile.mark("first menu frame")
+            profile.report()
+        self.start_decoder()
 
 # ----------- Video Intro ----------
-def play_video_intro(filename, musicfile):
-    pygame.mixer.music.stop()  # Stop any background music
-    try:
-        pygame.mixer.music.load(musicfile)
-        pygame.mixer.music.set_volume(0.7)
-        pygame.mixer.music.play()
-    except:
-        print("Warning: Could not play video music.")
-
-    cap = cv2.VideoCapture(filename)
-    if not cap.isOpened():
-        print("Error: Could not open video.")
-        return
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.transpose(frame)
-        frame = pygame.surfarray.make_surface(frame)
-        frame = pygame.transform.scale(frame, (WIDTH, HEIGHT))
-
-        screen.blit(frame, (0,0))
-        pygame.display.update()
-        clock.tick(30)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                cap.release()
-                pygame.quit()
-                sys.exit()
-
-    cap.release()
-    pygame.mixer.music.stop()
+INTRO_VIDEO = "starting.mp4"
+INTRO_MUSIC = "video_music.mp3"
+
+class VideoScene(Scene):
+    """Shows whichever decoded frame the music says is due, dropping or
+    repeating frames to stay in sync. Any key or click skips it."""
+
+    def __init__(self, decoder):
+        self.decoder = decoder
+        self.frame = None
+
+    def enter(self):
+        audio.stop_music()  # Stop any background music
+        if not play_music(INTRO_MUSIC, 0.7):
+            print("Warning: Could not play video music.")
+        if not self.decoder.wait_opened():
+            print("Error: Could not open video.")
+            self.manager.switch(GiftBoxScene())
+        self.media_clock = MediaClock()
+
+    def preload(self):
+        loader.submit("game_bg.mp3", read_bytes, "game_bg.mp3")
+
+    def frame_rate(self):
+        return 2 * self.decoder.fps
+
+    def handle(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.manager.switch(GiftBoxScene())
+
+    def update(self, dt):
+        audio.monitor()
+        self.frame = self.decoder.frame_at(self.media_clock.now())
+        if self.frame is END:
+            self.manager.switch(GiftBoxScene())
+
+    def render(self):
+        if self.frame is not None and self.frame is not END:
+            screen.blit(frame_surface(self.frame), (0,0))
+            pygame.display.update()
+
+    def exit(self):
+        self.decoder.stop()
+        audio.stop_music()
 
 # ----------- Gift Box Mini-Game ----------
-def gift_box_unlock():
-    try:
-        box_img = pygame.image.load("box.png").convert_alpha()
-        box_img = pygame.transform.scale(box_img, (120,150))
-    except:
-        box_img = pygame.Surface((120,150))
-        box_img.fill(BLUE)
-    
-    try:
-        key_img = pygame.image.load("key.png").convert_alpha()
-        key_img = pygame.transform.scale(key_img, (60,60))
-    except:
-        key_img = pygame.Surface((60,60))
-        key_img.fill(YELLOW)
-
-    gap = 50
-    start_x = (WIDTH - (3*120 + 2*gap)) // 2
-    boxes_pos = [pygame.Rect(start_x + i*(120+gap), HEIGHT//2-75, 120,150) for i in range(3)]
-    key_index = random.randint(0,2)
-    unlocked = False
-    popup_msg = ""
-    reveal_key = False
-
-    play_background_music()  # Start mini-game background music
-
-    while not unlocked:
-        screen.fill(WHITE)
-        draw_text_with_outline("Choose the box with the key 🔑", 40, GREEN, BLACK, WIDTH//2, HEIGHT//4)
-
-        for i, rect in enumerate(boxes_pos):
-            screen.blit(box_img, (rect.x, rect.y))
-            if reveal_key and i == key_index:
-                screen.blit(key_img, (rect.centerx-30, rect.centery-30))
-
-        if popup_msg:
-            draw_text_with_outline(popup_msg, 32, RED, BLACK, WIDTH//2, HEIGHT//2 + 120)
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                for i, rect in enumerate(boxes_pos):
-                    if rect.collidepoint(event.pos):
-                        if i == key_index:
-                            popup_msg = "You are right!"
-                            reveal_key = True
-                            pygame.display.flip()
-                            pygame.time.delay(1000)
-                            unlocked = True
-                        else:
-                            popup_msg = "You are wrong! Try again!"
+class GiftBoxScene(Scene):
+    waits_for_events = True
+
+    def enter(self):
+        self.box_img = sprites["box"]
+        self.key_img = sprites["key"]
+        gap = 50
+        start_x = (WIDTH - (3*120 + 2*gap)) // 2
+        self.boxes_pos = [pygame.Rect(start_x + i*(120+gap), HEIGHT//2-75, 120,150) for i in range(3)]
+        self.key_index = random.randint(0,2)
+        self.popup_msg = ""
+        self.reveal_key = False
+        self.shown = None
+        play_background_music()  # Start mini-game background music
+
+    def build(self, surf):
+        surf.fill(WHITE)
+        draw_text_with_outline("Choose the box with the key 🔑", 40, GREEN, BLACK, WIDTH//2, HEIGHT//4, target=surf)
+
+        for i, rect in enumerate(self.boxes_pos):
+            surf.blit(self.box_img, (rect.x, rect.y))
+            if self.reveal_key and i == self.key_index:
+                surf.blit(self.key_img, (rect.centerx-30, rect.centery-30))
+
+        if self.popup_msg:
+            draw_text_with_outline(self.popup_msg, 32, RED, BLACK, WIDTH//2, HEIGHT//2 + 120, target=surf)
+
+    def handle(self, event):
+        if needs_redraw([event]): self.shown = None
+        if event.type == pygame.MOUSEBUTTONDOWN and not self.reveal_key:
+            for i, rect in enumerate(self.boxes_pos):
+                if rect.collidepoint(event.pos):
+                    if i == self.key_index:
+                        self.popup_msg = "You are right!"
+                        self.reveal_key = True
+                        # Keep the revealed key on screen for a second
+                        self.manager.switch(GameScene(), delay_ms=1000)
+                    else:
+                        self.popup_msg = "You are wrong! Try again!"
+
+    def render(self):
+        # Only redrawn when the popup or the revealed key changes
+        frame = compositor.get("gift_box", (self.popup_msg, self.reveal_key, self.key_index), screen.get_size(), self.build)
+        if frame is not self.shown:
+            self.shown = frame
+            screen.blit(frame, (0,0))
+            pygame.display.flip()
 
 # ----------- Game Functions ----------
-def get_available_fruits():
-    return [b["fruit"] for b in boxes if b["fill"] < 1]
-
-def spawn_fruit():
-    global current_fruit
-    available = get_available_fruits()
-    if not available:
-        current_fruit = None
-        return
-    c = random.choice(available)
-    current_fruit = {
-        "type": c,
-        "image": fruit_images[c],
-        "x": random.randint(50, WIDTH-100),
-        "y": -80,
-        "letter": random.choice(string.ascii_uppercase),
-        "cut": False,
-        "cut_anim": 0
-    }
-
 def reset_game(level=1):
-    global score, timer, current_fruit, game_over, game_win, missed, start_ticks, FRUITS_TO_FILL
-    score = 0
-    timer = 50
-    current_fruit = None
-    game_over = False
-    game_win = False
-    missed = 0
-    start_ticks = pygame.time.get_ticks()
-    FRUITS_TO_FILL = 5 if level==1 else 6
-    for b in boxes: b["fill"] = 0
-    spawn_fruit()
+    state.reset(level)
     play_background_music()
 
+def show_popup(message):
+    global popup_message, popup_timer
+    popup_message = message
+    popup_timer = pygame.time.get_ticks()
+
 # ----------- Draw Boxes & Screens ----------
-def draw_boxes():
-    for b in boxes:
-        rect = pygame.Rect(b["x"],b["y"],box_width,box_height)
-        pygame.draw.rect(screen, GRAY, rect, border_radius=10)
-        pygame.draw.rect(screen, BLACK, rect,3,border_radius=10)
-        fill_h = int(b["fill"] * box_height)
-        if fill_h>0:
-            pygame.draw.rect(screen, fruit_colors[b["fruit"]],
-                             (b["x"],b["y"]+box_height-fill_h, box_width, fill_h), border_radius=5)
-        draw_text_with_outline(b["fruit"],20,BLACK,WHITE,rect.centerx,b["y"]+box_height+15)
-
-def game_over_screen():
-    global game_over
-    pygame.mixer.music.stop()
-    if lose_sound:
-        lose_sound.play()
-
-    screen.fill(BLACK)
-    draw_text_with_outline("GAME OVER!",64,RED,WHITE,WIDTH//2,HEIGHT//3)
-    draw_text_with_outline(f"Score: {score}",40,WHITE,BLACK,WIDTH//2,HEIGHT//2)
-    if lose_reason:
-        draw_text_with_outline(lose_reason,30,YELLOW,BLACK,WIDTH//2,HEIGHT//2+50)
-    
-    button_rect = pygame.Rect(WIDTH//2-100, HEIGHT//2+110, 200, 60)
-    pygame.draw.rect(screen, BLUE, button_rect, border_radius=10)
-    draw_text_with_outline("RESTART",36,WHITE,BLACK,WIDTH//2, HEIGHT//2+140)
-    pygame.display.flip()
-
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type==pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type==pygame.MOUSEBUTTONDOWN:
-                if button_rect.collidepoint(event.pos):
-                    reset_game(level=LEVEL)
-                    waiting=False
-
-def level_completion_screen():
-    global LEVEL
-    pygame.mixer.music.stop()
-    if win_sound:
-        win_sound.play()
-
-    screen.fill(BLACK)
-    draw_text_with_outline(f"Level {LEVEL} Completed!", 64, GREEN, BLACK, WIDTH//2, HEIGHT//3)
-    draw_text_with_outline(f"Score: {score}", 40, WHITE, BLACK, WIDTH//2, HEIGHT//2)
-
-    continue_rect = pygame.Rect(WIDTH//2-120, HEIGHT//2+100, 100, 50)
-    quit_rect = pygame.Rect(WIDTH//2+20, HEIGHT//2+100, 100, 50)
-    pygame.draw.rect(screen, BLUE, continue_rect, border_radius=10)
-    pygame.draw.rect(screen, RED, quit_rect, border_radius=10)
-    draw_text_with_outline("CONTINUE",28,WHITE,BLACK,continue_rect.centerx, continue_rect.centery)
-    draw_text_with_outline("QUIT",28,WHITE,BLACK,quit_rect.centerx, quit_rect.centery)
-
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type==pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type==pygame.MOUSEBUTTONDOWN:
-                if continue_rect.collidepoint(event.pos):
-                    LEVEL += 1
-                    reset_game(level=LEVEL)
-                    waiting = False
-                elif quit_rect.collidepoint(event.pos):
-                    pygame.quit(); sys.exit()
-        pygame.display.flip()
-        clock.tick(FPS)
-
-def game_win_screen():
-    # Redirect to level completion screen
-    level_completion_screen()
+def draw_box(target, b):
+    rect = pygame.Rect(b["x"],b["y"],box_width,box_height)
+    pygame.draw.rect(target, GRAY, rect, border_radius=10)
+    pygame.draw.rect(target, BLACK, rect,3,border_radius=10)
+    fill_h = int(b["fill"] * box_height)
+    if fill_h>0:
+        pygame.draw.rect(target, fruit_colors[b["fruit"]],
+                         (b["x"],b["y"]+box_height-fill_h, box_width, fill_h), border_radius=5)
+    draw_text_with_outline(b["fruit"],20,BLACK,WHITE,rect.centerx,b["y"]+box_height+15,target=target)
+
+def draw_boxes(target=None):
+    target = target or screen
+    for b in state.boxes:
+        draw_box(target, b)
+
+def board_background():
+    """White board with the boxes drawn in, built once per board. After
+    that only boxes whose fill changed are repainted, in place; returns
+    the board and the areas repainted (None if it was rebuilt)."""
+    board = state.board
+    rebuilt = []
+    def build(surf):
+        surf.fill(WHITE)
+        draw_boxes(surf)
+        board.take_dirty()
+        rebuilt.append(True)
+    surf = compositor.get("board", board.serial, screen.get_size(), build)
+    if rebuilt: return surf, None
+    changed = []
+    for i in board.take_dirty():
+        b = board.boxes[i]
+        area = box_area(b)
+        surf.fill(WHITE, area)
+        draw_box(surf, b)
+        changed.append(area)
+    return surf, changed
+
+def box_area(b):
+    """Screen area covered by a box and its label."""
+    return pygame.Rect(b["x"]-3, b["y"]-3, box_width+6, box_height+40)
+
+def draw_leaderboard(surf, rows, y):
+    """Top scores, one small line each, starting at y."""
+    if not rows: return
+    draw_text_with_outline("TOP SCORES", 24, ORANGE, BLACK, WIDTH//2, y, target=surf)
+    for i, (player, score, _) in enumerate(rows[:3]):
+        draw_text_with_outline(f"{i+1}. {player}  {score}", 22, WHITE, BLACK, WIDTH//2, y + 25*(i+1), target=surf)
+
+class EndScene(Scene):
+    """A static end screen: drawn once, then redrawn only on expose or
+    when the leaderboard has been read."""
+    waits_for_events = True
+    board_level = True     # leaderboard for this level; False for all levels
+
+    def enter(self):
+        audio.stop_music()
+        self.dirty = True
+        self.rows = None
+        self.board = leaderboard(state.level if self.board_level else None)
+
+    def update(self, dt):
+        if self.rows is None and self.board is not None and self.board.done():
+            try: self.rows = tuple(self.board.result() or ())
+            except: self.rows = ()
+            self.dirty = True
+
+    def handle(self, event):
+        if needs_redraw([event]): self.dirty = True
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.click(event.pos)
+
+    def render(self):
+        if self.dirty:
+            screen.blit(self.frame(), (0,0))
+            pygame.display.flip()
+            self.dirty = False
+
+class GameOverScene(EndScene):
+    def enter(self):
+        super().enter()
+        audio.play("lose")
+        self.button_rect = pygame.Rect(WIDTH//2-100, HEIGHT//2+110, 200, 60)
+
+    def build(self, surf):
+        surf.fill(BLACK)
+        draw_text_with_outline("GAME OVER!",64,RED,WHITE,WIDTH//2,HEIGHT//3,target=surf)
+        draw_text_with_outline(f"Score: {state.score}",40,WHITE,BLACK,WIDTH//2,HEIGHT//2,target=surf)
+        if state.lose_reason:
+            draw_text_with_outline(state.lose_reason,30,YELLOW,BLACK,WIDTH//2,HEIGHT//2+50,target=surf)
+        pygame.draw.rect(surf, BLUE, self.button_rect, border_radius=10)
+        draw_text_with_outline("RESTART",36,WHITE,BLACK,WIDTH//2, HEIGHT//2+140,target=surf)
+        draw_leaderboard(surf, self.rows, HEIGHT//2+195)
+
+    def frame(self):
+        return compositor.get("game_over", (state.score, state.lose_reason, self.rows), screen.get_size(), self.build)
+
+    def click(self, pos):
+        if self.button_rect.collidepoint(pos):
+            self.manager.switch(GameScene(state.level))
+
+class LevelCompleteScene(EndScene):
+    def enter(self):
+        super().enter()
+        audio.play("win")
+        self.continue_rect = pygame.Rect(WIDTH//2-120, HEIGHT//2+100, 100, 50)
+        self.quit_rect = pygame.Rect(WIDTH//2+20, HEIGHT//2+100, 100, 50)
+
+    def build(self, surf):
+        surf.fill(BLACK)
+        draw_text_with_outline(f"Level {state.level} Completed!", 64, GREEN, BLACK, WIDTH//2, HEIGHT//3, target=surf)
+        draw_text_with_outline(f"Score: {state.score}", 40, WHITE, BLACK, WIDTH//2, HEIGHT//2, target=surf)
+        pygame.draw.rect(surf, BLUE, self.continue_rect, border_radius=10)
+        pygame.draw.rect(surf, RED, self.quit_rect, border_radius=10)
+        draw_text_with_outline("CONTINUE",28,WHITE,BLACK,self.continue_rect.centerx, self.continue_rect.centery, target=surf)
+        draw_text_with_outline("QUIT",28,WHITE,BLACK,self.quit_rect.centerx, self.quit_rect.centery, target=surf)
+        draw_leaderboard(surf, self.rows, HEIGHT//2+185)
+
+    def frame(self):
+        return compositor.get("level_complete", (state.level, state.score, self.rows), screen.get_size(), self.build)
+
+    def click(self, pos):
+        if self.continue_rect.collidepoint(pos):
+            self.manager.switch(GameScene(state.level+1))
+        elif self.quit_rect.collidepoint(pos):
+            self.manager.quit()
+
+class WinScene(EndScene):
+    """Shown after the last level of a campaign that ends ("after_last": "win")."""
+    board_level = False
+
+    def enter(self):
+        super().enter()
+        audio.play("win")
+        self.button_rect = pygame.Rect(WIDTH//2-100, HEIGHT//2+110, 200, 60)
+
+    def build(self, surf):
+        surf.fill(BLACK)
+        draw_text_with_outline("🎉 YOU WIN! 🎉",64,GREEN,BLACK,WIDTH//2,HEIGHT//3,target=surf)
+        draw_text_with_outline(f"Final Score: {state.score}",40,WHITE,BLACK,WIDTH//2,HEIGHT//2,target=surf)
+        pygame.draw.rect(surf, BLUE, self.button_rect, border_radius=10)
+        draw_text_with_outline("PLAY AGAIN",36,WHITE,BLACK,WIDTH//2, HEIGHT//2+140,target=surf)
+        draw_leaderboard(surf, self.rows, HEIGHT//2+195)
+
+    def frame(self):
+        return compositor.get("win", (state.score, self.rows), screen.get_size(), self.build)
+
+    def click(self, pos):
+        if self.button_rect.collidepoint(pos):
+            self.manager.switch(GameScene(1))
 
 # ----------- Main Loop ----------
-def main_game_loop():
-    global current_fruit, game_over, game_win, score, timer, missed, popup_message, popup_timer, lose_reason
-    reset_game(LEVEL)
-    while True:
-        dt = clock.tick(FPS)
-        screen.fill(WHITE)
-
-        # Events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if not game_over and not game_win and event.type==pygame.KEYDOWN:
-                key = event.unicode.upper()
-                if current_fruit and not current_fruit["cut"] and current_fruit["letter"]==key:
-                    current_fruit["cut"] = True
-                    current_fruit["cut_anim"] = 10
-                    score += 1
-                    for b in boxes:
-                        if b["fruit"]==current_fruit["type"]:
-                            b["fill"] += 1/FRUITS_TO_FILL
-                            if b["fill"]>1: b["fill"]=1
-                            break
-                    if fill_sound: fill_sound.play()
-                    if cut_sound: cut_sound.play()
-                elif current_fruit:
-                    game_over=True
-                    lose_reason = "Wrong key pressed!"
-                    popup_message = "Wrong key!"
-                    popup_timer = pygame.time.get_ticks()
-
-        # Timer
-        if not game_over and not game_win:
-            seconds = (pygame.time.get_ticks()-start_ticks)//1000
-            timer=50-seconds
-            if timer<=0:
-                game_over=True
-                lose_reason = "Time's up!"
-
-        # Update fruit
-        if current_fruit:
-            if not current_fruit["cut"]:
-                current_fruit["y"] += fruit_speed
-                if current_fruit["y"] > HEIGHT:
-                    missed += 1
-                    popup_message = "Missed a fruit!"
-                    popup_timer = pygame.time.get_ticks()
-                    if missed >= MAX_MISSES:
-                        game_over = True
-                        lose_reason = "Too many fruits missed!"
-                    current_fruit = None
-            elif current_fruit["cut_anim"] > 0:
-                current_fruit["cut_anim"] -= 1
-                current_fruit["y"] -= 2
-            else:
-                current_fruit = None
-
-        # Spawn next fruit
-        if not current_fruit and not game_over and not game_win:
-            spawn_fruit()
-
-        # Draw current fruit
-        if current_fruit:
-            screen.blit(current_fruit["image"], (current_fruit["x"], current_fruit["y"]))
-            draw_text_with_outline(current_fruit["letter"], 28, WHITE, BLACK,
-                                   current_fruit["x"]+35, current_fruit["y"]-20)
-
-        # Draw boxes
-        draw_boxes()
+class GameScene(Scene):
+    def __init__(self, level=None):
+        self.level = level
+
+    def enter(self):
+        finish_loading()
+        reset_game(state.level if self.level is None else self.level)
+        renderer.invalidate()
+        if particles: particles.clear()
+        self.stepper = game_core.FixedTimestep()
+        self.keys = []
+
+    def frame_rate(self):
+        return FPS
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN:
+            self.keys.append(event.unicode)
+            latency.key()
+
+    def update(self, dt):
+        # Rules: as many fixed ticks as the frame time covers. A frame too
+        # short for a tick still applies its keys (a zero-length step), so
+        # a key is never held back to the next frame.
+        audio.monitor()
+        ticks = self.stepper.ticks(dt / 1000)
+        if not ticks and self.keys:
+            self.apply(game_core.step(state, self.keys, 0.0))
+        for _ in range(ticks):
+            self.apply(game_core.step(state, self.keys, self.stepper.tick))
+        if particles:
+            with profiler.phase("particles"):
+                particles.update(dt / 1000)
+
+        # Game over / win
+        if state.finished: save_result()
+        if state.game_over:
+            self.manager.switch(GameOverScene())
+        elif state.game_win:
+            if state.campaign.is_last(state.level): self.manager.switch(WinScene())
+            else: self.manager.switch(LevelCompleteScene())
+
+    def apply(self, events):
+        if telemetry: telemetry.game(events, state)
+        for kind, detail in events:
+            if kind == "cut":
+                audio.play("fill")
+                audio.play("cut")
+                if particles:
+                    name, x, y = detail
+                    particles.burst(name, x + 35, y + 35)
+                latency.outcome(kind)
+            elif kind == "wrong_key":
+                show_popup("Wrong key!")
+                latency.outcome(kind)
+            elif kind == "typo":
+                show_popup("Typo!")
+                latency.outcome(kind)
+            elif kind == "letter":
+                latency.outcome(kind)
+            elif kind == "miss":
+                show_popup("Missed a fruit!")
+        if self.keys: latency.settle()
+        self.keys = []
+
+    def render(self):
+        alpha = self.stepper.alpha
+
+        # Boxes are part of the background; only boxes whose fill changed are repainted
+        with profiler.phase("boxes"):
+            board, changed = board_background()
+            renderer.set_background(board, dirty=changed)
+
+        # Draw fruits
+        with profiler.phase("fruit"):
+            self.draw_fruits(alpha)
+        if particles:
+            with profiler.phase("particles"):
+                renderer.draw_batch("particles", *particles.draw_list())
 
         # HUD
-        draw_text_with_outline(f"Score: {score}",28,BLACK,WHITE,10,10,center=False)
-        draw_text_with_outline(f"Time: {timer}",28,BLACK,WHITE,WIDTH-150,10,center=False)
-        draw_text_with_outline(f"Missed: {missed}/{MAX_MISSES}",28,RED,WHITE,10,50,center=False)
+        queue_text("score", f"Score: {state.score}",28,BLACK,WHITE,10,10,center=False)
+        queue_text("time", f"Time: {state.timer}",28,BLACK,WHITE,WIDTH-150,10,center=False)
+        queue_text("missed", f"Missed: {state.missed}/{state.max_misses}",28,RED,WHITE,10,50,center=False)
+        if WORDS and state.typed:
+            queue_text("typed", state.typed,32,YELLOW,BLACK,WIDTH//2,40)
 
         # Popup
         if popup_message and pygame.time.get_ticks() - popup_timer < POPUP_DURATION:
-            draw_text_with_outline(popup_message,30,ORANGE,BLACK,WIDTH//2,80)
-
-        # Game over / win
-        if game_over:
-            game_over_screen()
-        if all(b["fill"] >= 1 for b in boxes):
-            game_win = True
-            game_win_screen()
-
-        pygame.display.flip()
+            queue_text("popup", popup_message,30,ORANGE,BLACK,WIDTH//2,80)
+
+        draw_profiler_overlay()
+        with profiler.phase("present"):
+            renderer.present()
+        latency.presented()
+
+    def draw_fruits(self, alpha):
+        if RUSH:
+            store = state.store
+            idx = store.active()
+            ys = store.lerp_y(idx, alpha).astype(int).tolist()
+            for i, x, y in zip(idx.tolist(), store.x[idx].astype(int).tolist(), ys):
+                renderer.draw(("fruit", i), fruit_images[state.types[store.kind[i]]], (x, y))
+                if WORDS: self.draw_word(i, x+35, y-20)
+                else: queue_text(("letter", i), chr(65 + int(store.letter[i])), 28, WHITE, BLACK, x+35, y-20, layer=LABELS)
+        fruit = state.fruit
+        if fruit:
+            x, y = fruit["x"], int(game_core.lerp_y(fruit, alpha))
+            renderer.draw("fruit", fruit_images[fruit["type"]], (x, y))
+            queue_text("letter", fruit["letter"], 28, WHITE, BLACK, x+35, y-20, layer=LABELS)
+
+    def draw_word(self, i, x, y):
+        """A fruit's word, with the part typed so far over it in yellow."""
+        word = state.words.get(i)
+        if word is None: return   # already cut
+        rect = queue_text(("letter", i), word, 24, WHITE, BLACK, x, y, layer=LABELS)
+        typed = state.typed
+        if typed and word.startswith(typed):
+            # Same top-left as the word, so the prefix covers its letters exactly
+            renderer.draw(("typed", i), text_cache.render(typed, 24, YELLOW, BLACK), rect.topleft, LABELS)
 
 # ----------- Run Everything ----------
-front_page()
-play_video_intro("starting.mp4", "video_music.mp3")
-gift_box_unlock()
-main_game_loop()
\ No newline at end of file
+def main(campaign="juicy_time"):
+    global scores, session_id, resume, telemetry
+    # --campaign=NAME plays levels/NAME.json (harika.py uses "harika")
+    state.campaign = game_core.load_campaign(arg_value("campaign", campaign))
+    # --profile times every frame phase and writes the trace to
+    # --profile-out (.json or .csv) on exit; F3 shows the overlay
+    if "--profile" in sys.argv:
+        profiler.enabled = True
+        atexit.register(profiler.dump, arg_value("profile-out", "frame_trace.json"))
+    # --record=PATH logs the seed, frame times and input of this session;
+    # --replay=PATH plays one back (add --replay-fast to skip the waits)
+    recorder = player = None
+    if arg_value("replay", ""):
+        player = replay.Player(arg_value("replay", ""), realtime="--replay-fast" not in sys.argv)
+        seed = player.seed
+    else:
+        seed = arg_value("seed", replay.new_seed())
+    replay.seed_all(seed, state)
+    if arg_value("record", ""):
+        recorder = replay.Recorder(arg_value("record", ""), seed)
+        atexit.register(recorder.close)
+    # --audio-buffer sets the mixer buffer in samples; --audio-report
+    # prints latency, voice stealing and underruns on exit
+    audio.buffer = arg_value("audio-buffer", audio.buffer)
+    if "--audio-report" in sys.argv:
+        atexit.register(audio.report)
+    # --latency reports key-to-screen latency on exit; --low-latency polls
+    # input through the frame wait (--busy-wait spins its last millisecond)
+    if "--latency" in sys.argv:
+        latency.enabled = True
+        atexit.register(latency.report)
+    pacer = None
+    if "--low-latency" in sys.argv:
+        pacer = LowLatencyPacer(latency, busy_wait="--busy-wait" in sys.argv)
+    # Replays are not saved, and a recorded session always starts at level
+    # 1 so its replay does too
+    if not player and "--no-scores" not in sys.argv:
+        from scores import ScoreStore
+        scores = ScoreStore(arg_value("scores", "scores.db"))
+        session_id = scores.start_session(PLAYER, state.campaign.name, MODE, seed)
+        atexit.register(scores.close)
+        atexit.register(scores.end_session, session_id)
+        if not recorder:
+            resume = scores.progress(PLAYER, state.campaign.name, MODE)
+    if not player and "--telemetry" in sys.argv:
+        from telemetry import Telemetry
+        telemetry = Telemetry(arg_value("telemetry-dir", "telemetry"),
+                              int(arg_value("telemetry-max-mb", 8.0) * (1 << 20))).start()
+        atexit.register(telemetry.report)
+        atexit.register(telemetry.close)
+    init()
+    SceneManager(clock, recorder, player, pacer).run(MenuScene())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import time
+import pygame
+from stats import summarize
+
+# ----------- Input Latency -------------
+class LatencyTracker:
+    """Time from a KEYDOWN being read to the first frame that shows its
+    result (a cut or a wrong-key popup).
+
+    A key can also sit in the event queue for the whole gap between two
+    polls before it is read; that gap is recorded per key as "unread", so
+    read-to-present plus unread is the worst case a typist can see.
+    """
+
+    def __init__(self, enabled=False, window=2000):
+        self.enabled = enabled
+        self.window = window
+        self.last_poll = time.perf_counter()
+        self.poll_gap = 0.0
+        self.keys = []        # (read at, unread gap) for keys not yet resolved
+        self.shown = []       # (kind, read at, gap) waiting for the next present
+        self.samples = {}     # kind -> [ms]
+        self.unread = []
+        self.ignored = 0
+
+    def polled(self):
+        now = time.perf_counter()
+        self.poll_gap = now - self.last_poll
+        self.last_poll = now
+
+    def key(self):
+        if self.enabled:
+            self.keys.append((self.last_poll, self.poll_gap))
+
+    def outcome(self, kind):
+        """The oldest unresolved key produced `kind` (cut, wrong_key)."""
+        if self.keys:
+            self.shown.append((kind,) + self.keys.pop(0))
+
+    def settle(self):
+        """Keys a tick consumed without any outcome (nothing on screen)."""
+        self.ignored += len(self.keys)
+        self.keys = []
+
+    def presented(self):
+        if not self.shown: return
+        now = time.perf_counter()
+        for kind, read_at, gap in self.shown:
+            samples = self.samples.setdefault(kind, [])
+            samples.append((now - read_at) * 1000)
+            del samples[:-self.window]
+            self.unread.append(gap * 1000)
+        del self.unread[:-self.window]
+        self.shown = []
+
+    def stats(self):
+        out = {kind: summarize(v) for kind, v in sorted(self.samples.items())}
+        out["unread"] = summarize(self.unread)
+        out["ignored"] = self.ignored
+        return out
+
+    def report(self):
+        if not self.enabled: return
+        stats = self.stats()
+        print("Input latency, key read to presented (ms):")
+        for kind, s in stats.items():
+            if isinstance(s, dict) and s["n"]:
+                print(f"  {kind:<10} n={s['n']:<5} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  "
+                      f"p99 {s['p99']:6.2f}  max {s['max']:6.2f}")
+        print(f"  keys ignored: {stats['ignored']}")
+
+# ----------- Low-Latency Pacing -------------
+class LowLatencyPacer:
+    """Frame pacing for --low-latency.
+
+    Instead of one clock.tick() sleep followed by a poll, the wait for the
+    next frame is cut into short sleeps with a poll after each, and the
+    frame starts as soon as a key or click arrives, so it is handled and
+    presented this frame. With busy_wait the last spin_ms before the frame
+    deadline spins instead of sleeping, since a sleep can overshoot by a
+    millisecond or more on some systems. Frame times are whole ms (the
+    remainder carries over) so they record and replay exactly.
+    """
+
+    INPUT = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.QUIT)
+
+    def __init__(self, tracker, busy_wait=False, slice_ms=1.0, spin_ms=1.0):
+        self.tracker = tracker
+        self.busy_wait = busy_wait
+        self.slice = slice_ms / 1000
+        self.spin = spin_ms / 1000 if busy_wait else 0.0
+        self.last = time.perf_counter()
+
+    def wait(self, fps):
+        deadline = self.last + 1 / fps
+        events = []
+        while True:
+            events += pygame.event.get()
+            self.tracker.polled()
+            now = time.perf_counter()
+            if now >= deadline or any(e.type in self.INPUT for e in events):
+                break
+            remaining = deadline - now - self.spin
+            if remaining > 0:
+                time.sleep(min(self.slice, remaining))
+        dt = int((now - self.last) * 1000)
+        self.last += dt / 1000
+        return dt, events
+
+    def reset(self):
+        self.last = time.perf_counter()
+
+latency = LatencyTracker()
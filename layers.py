@@ -0,0 +1,68 @@
+import pygame
+
+# ----------- Static Layer Compositor -------------
+class LayerCompositor:
+    """Caches the static parts of a screen as pre-drawn surfaces.
+
+    Each named layer is rebuilt only when its key (whatever inputs it was
+    drawn from, plus the target size) changes; otherwise the cached surface
+    is returned and the screen is composited from a few full blits.
+    """
+
+    def __init__(self):
+        self.layers = {}   # name -> (key, surface)
+        self.builds = 0
+        self.hits = 0
+
+    def get(self, name, key, size, build, alpha=False):
+        """Return the surface for name, calling build(surface) if stale."""
+        key = (key, tuple(size), alpha)
+        cached = self.layers.get(name)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        if alpha:
+            surf = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        else:
+            surf = pygame.Surface(size).convert()
+        build(surf)
+        self.layers[name] = (key, surf)
+        self.builds += 1
+        return surf
+
+    def invalidate(self, name=None):
+        if name is None: self.layers.clear()
+        else: self.layers.pop(name, None)
+
+    def stats(self):
+        return {"layers": len(self.layers), "builds": self.builds, "hits": self.hits}
+
+# ----------- Gradients -------------
+def row_gradient(size, rows):
+    """Surface whose row y is filled with rows(y_array) -> (r, g, b) arrays.
+
+    Generated in one pass through surfarray when numpy is available, with a
+    line-by-line fallback otherwise.
+    """
+    w, h = size
+    surf = pygame.Surface((w, h)).convert()
+    try:
+        import numpy as np
+        y = np.arange(h)
+        r, g, b = rows(y)
+        col = np.empty((h, 3), dtype=np.uint8)
+        for i, c in enumerate((r, g, b)):
+            col[:, i] = np.clip(np.broadcast_to(c, (h,)), 0, 255)
+        pygame.surfarray.blit_array(surf, np.broadcast_to(col, (w, h, 3)))
+    except ImportError:
+        for i in range(h):
+            r, g, b = rows(i)
+            color = [min(255, max(0, int(c))) for c in (r, g, b)]
+            pygame.draw.line(surf, color, (0, i), (w, i))
+    return surf
+
+def menu_gradient(size):
+    """The menu's fallback background: (255 - y//3, 255, 255 - y//3)."""
+    return row_gradient(size, lambda y: (255 - y//3, 255, 255 - y//3))
+
+compositor = LayerCompositor()
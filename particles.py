@@ -0,0 +1,183 @@
+import numpy as np
+import pygame
+from dirty_render import blit_all
+
+# ----------- Particle Sprites -------------
+def fade_frames(surf, stages=4):
+    """surf shrinking and fading out, one frame per stage."""
+    w, h = surf.get_size()
+    frames = []
+    for i in range(stages):
+        k = 1 - i / stages
+        f = pygame.transform.smoothscale(surf, (max(1, round(w * (0.5 + 0.5*k))), max(1, round(h * (0.5 + 0.5*k)))))
+        f.fill((255, 255, 255, round(255 * k)), special_flags=pygame.BLEND_RGBA_MULT)
+        frames.append(f)
+    return frames
+
+def spin_frames(surf, steps=8):
+    """surf rotated through a full turn."""
+    return [pygame.transform.rotate(surf, 360 * i / steps) for i in range(steps)]
+
+def droplet(color, radius):
+    surf = pygame.Surface((2*radius, 2*radius), pygame.SRCALPHA)
+    pygame.draw.circle(surf, color, (radius, radius), radius)
+    light = tuple(min(255, c + 90) for c in color[:3])
+    pygame.draw.circle(surf, light, (radius - radius//3, radius - radius//3), max(1, radius//3))
+    return surf
+
+def splash(color, size=(64, 24)):
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.ellipse(surf, tuple(color[:3]) + (170,), surf.get_rect())
+    return surf
+
+# ----------- Particle System -------------
+class ParticleSystem:
+    """Cut effects (fruit halves, juice droplets, a splash) as NumPy arrays.
+
+    Every particle is one slot of fixed-size parallel arrays, so an update
+    is a handful of whole-array operations however many are alive, and
+    drawing is one batched blit of pre-rendered frames. capacity is a hard
+    budget: a burst that does not fit is cut short (counted in dropped),
+    so fast typing never costs more than a full pool. Dead slots are
+    reused by the next burst.
+
+    Animations are runs of frames in one sprite list. A particle shows
+    frame (age * rate) of its animation, clamped at the last frame, or
+    wrapped for looping ones (the spinning halves).
+    """
+
+    def __init__(self, capacity=256, bounds=(900, 600), gravity=1400.0, seed=None):
+        self.capacity = capacity
+        self.bounds = bounds
+        self.gravity = gravity
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.g = np.zeros(capacity, np.float32)      # gravity scale
+        self.age = np.zeros(capacity, np.float32)
+        self.ttl = np.zeros(capacity, np.float32)    # age >= ttl is a free slot
+        self.rate = np.zeros(capacity, np.float32)   # animation frames per second
+        self.anim = np.zeros(capacity, np.int16)
+        # Cosmetic only: its own generator, so the game's seeded RNG is untouched
+        self.rng = np.random.default_rng(seed)
+        self.frames = []      # every sprite frame
+        self.anims = []       # (first frame, frame count, loops)
+        self.effects = {}     # fruit name -> animation ids
+        self._tables = None
+        self.emitted = 0
+        self.dropped = 0
+        self.peak = 0
+
+    # ----------- Sprites -------------
+    def add_animation(self, frames, loop=False):
+        self.anims.append((len(self.frames), len(frames), loop))
+        self.frames.extend(frames)
+        self._tables = None
+        return len(self.anims) - 1
+
+    def add_fruit(self, name, image, color):
+        """Pre-render the cut effect of one fruit type."""
+        w, h = image.get_size()
+        self.effects[name] = {
+            "halves": [self.add_animation(spin_frames(image.subsurface(r).copy()), loop=True)
+                       for r in ((0, 0, w//2, h), (w//2, 0, w - w//2, h))],
+            "drops": [self.add_animation(fade_frames(droplet(color, r))) for r in (3, 5, 7)],
+            "splash": self.add_animation(fade_frames(splash(color))),
+        }
+
+    def _build_tables(self):
+        first, count, loop = zip(*self.anims)
+        self._first = np.array(first, np.int32)
+        self._count = np.array(count, np.int32)
+        self._loop = np.array(loop, bool)
+        self._size = np.array([f.get_size() for f in self.frames], np.int32)
+        self._tables = True
+
+    # ----------- Emitting -------------
+    def alive(self):
+        return np.flatnonzero(self.age < self.ttl)
+
+    def clear(self):
+        self.ttl[:] = 0
+        self.age[:] = 0
+
+    def emit(self, anims, n, x, y, speed, angle, ttl, gravity=1.0, spin=0.0):
+        """Emit up to n particles at (x, y), each showing one of anims.
+
+        speed, angle (degrees, 0 = right, -90 = up) and ttl are (low, high)
+        ranges drawn per particle. Fading animations play once over the
+        particle's life; looping ones turn at spin frames per second.
+        """
+        free = np.flatnonzero(self.age >= self.ttl)[:n]
+        self.dropped += n - free.size
+        n = free.size
+        if not n: return 0
+        rng = self.rng
+        a = np.radians(rng.uniform(*angle, n))
+        v = rng.uniform(*speed, n)
+        life = rng.uniform(*ttl, n)
+        ids = rng.choice(np.asarray(anims, np.int16), n)
+        self.x[free] = x
+        self.y[free] = y
+        self.vx[free] = np.cos(a) * v
+        self.vy[free] = np.sin(a) * v
+        self.g[free] = gravity
+        self.age[free] = 0
+        self.ttl[free] = life
+        self.anim[free] = ids
+        if self._tables is None: self._build_tables()
+        self.rate[free] = spin if spin else self._count[ids] / life
+        self.emitted += n
+        return n
+
+    def burst(self, name, x, y):
+        """The cut effect of fruit name centred on (x, y)."""
+        fx = self.effects.get(name)
+        if fx is None: return
+        # Halves first, so a pool near its budget still splits the fruit
+        for side, angle in zip(fx["halves"], ((-150, -120), (-60, -30))):
+            self.emit([side], 1, x, y, (220, 300), angle, (0.6, 0.8), spin=self.rng.uniform(10, 16))
+        self.emit(fx["drops"], 14, x, y, (150, 450), (-170, -10), (0.35, 0.7))
+        self.emit([fx["splash"]], 1, x, y + 20, (0, 0), (0, 0), (0.25, 0.25), gravity=0.0)
+
+    # ----------- Update and Draw -------------
+    def update(self, dt):
+        idx = self.alive()
+        if not idx.size: return
+        self.peak = max(self.peak, idx.size)
+        self.vy[idx] += self.gravity * self.g[idx] * dt
+        self.x[idx] += self.vx[idx] * dt
+        self.y[idx] += self.vy[idx] * dt
+        self.age[idx] += dt
+        # Anything that fell off the screen is done early
+        w, h = self.bounds
+        gone = idx[(self.y[idx] > h + 40) | (self.x[idx] < -40) | (self.x[idx] > w + 40)]
+        self.age[gone] = self.ttl[gone]
+
+    def draw_list(self):
+        """(blits sequence, screen rects) for the live particles."""
+        idx = self.alive()
+        if not idx.size: return [], []
+        if self._tables is None: self._build_tables()
+        anim = self.anim[idx]
+        step = (self.age[idx] * self.rate[idx]).astype(np.int32)
+        count = self._count[anim]
+        step = np.where(self._loop[anim], step % count, np.minimum(step, count - 1))
+        frame = self._first[anim] + step
+        size = self._size[frame]
+        left = self.x[idx].astype(np.int32) - size[:, 0] // 2
+        top = self.y[idx].astype(np.int32) - size[:, 1] // 2
+        pos = np.stack((left, top), 1).tolist()
+        frames = self.frames
+        seq = [(frames[f], p) for f, p in zip(frame.tolist(), pos)]
+        rects = np.concatenate((np.stack((left, top), 1), size), 1).tolist()
+        return seq, rects
+
+    def draw(self, target):
+        seq, _ = self.draw_list()
+        if seq: blit_all(target, seq)
+
+    def stats(self):
+        return {"capacity": self.capacity, "alive": int(self.alive().size), "peak": self.peak,
+                "emitted": self.emitted, "dropped": self.dropped}
@@ -0,0 +1,128 @@
+import csv
+import heapq
+import json
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+import pygame
+from stats import summarize
+
+# ----------- Frame Profiler -------------
+class FrameProfiler:
+    """Times each phase of every frame and keeps rolling statistics.
+
+    Wrap work in `with profiler.phase("name"):`; a phase entered several
+    times in one frame (text rendering, say) is summed for that frame, and
+    a phase nested in another is also counted in its parent. Frames are
+    delimited by begin_frame()/end_frame(). The last `window` frames feed
+    the percentiles, the `spikes` slowest frames are kept with their
+    breakdown, and every frame is kept (up to max_trace) for dump().
+    """
+
+    def __init__(self, enabled=False, window=600, spikes=10, max_trace=200000):
+        self.enabled = enabled
+        self.window = window
+        self.frames = deque(maxlen=window)
+        self.phases = defaultdict(lambda: deque(maxlen=window))
+        self.spikes = []      # min-heap of (frame ms, frame no, phases)
+        self.n_spikes = spikes
+        self.trace = []
+        self.max_trace = max_trace
+        self.frame_no = 0
+        self.current = defaultdict(float)
+        self.frame_start = None
+        self.overlay = False
+        self._overlay_surf = None
+        self._overlay_at = 0
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] += time.perf_counter() - t
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+
+    def discard_frame(self):
+        self.current = defaultdict(float)
+        self.frame_start = None
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        total = (time.perf_counter() - self.frame_start) * 1000
+        phases = {k: v * 1000 for k, v in self.current.items()}
+        self.current = defaultdict(float)
+        self.frame_no += 1
+        self.frames.append(total)
+        for k, v in phases.items():
+            self.phases[k].append(v)
+        item = (total, self.frame_no, phases)
+        if len(self.spikes) < self.n_spikes:
+            heapq.heappush(self.spikes, item)
+        elif total > self.spikes[0][0]:
+            heapq.heapreplace(self.spikes, item)
+        if len(self.trace) < self.max_trace:
+            self.trace.append((self.frame_no, round(total, 3), {k: round(v, 3) for k, v in phases.items()}))
+
+    # ----------- Statistics -------------
+    def stats(self):
+        out = {"frames": self.frame_no, "frame": summarize(self.frames)}
+        out["phases"] = {k: summarize(v) for k, v in sorted(self.phases.items())}
+        out["spikes"] = [{"frame": n, "ms": round(t, 3), "phases": {k: round(v, 3) for k, v in p.items()}}
+                         for t, n, p in sorted(self.spikes, reverse=True)]
+        return out
+
+    def dump(self, path):
+        """Write the per-frame trace and summary as .json, or the trace as .csv."""
+        if path.endswith(".csv"):
+            names = sorted({k for _, _, p in self.trace for k in p})
+            with open(path, "w", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["frame", "total_ms"] + names)
+                for n, total, p in self.trace:
+                    w.writerow([n, total] + [p.get(k, 0) for k in names])
+        else:
+            with open(path, "w") as f:
+                json.dump({"summary": self.stats(),
+                           "trace": [{"frame": n, "ms": t, "phases": p} for n, t, p in self.trace]}, f)
+
+    # ----------- Overlay -------------
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enabled = True
+
+    def overlay_surface(self, font_size=16, refresh_ms=500):
+        """Small panel with the current stats, re-rendered every refresh_ms."""
+        now = pygame.time.get_ticks()
+        if self._overlay_surf is not None and now - self._overlay_at < refresh_ms:
+            return self._overlay_surf
+        from text_cache import text_cache
+        font = text_cache.fonts.get("consolas,couriernew,monospace", font_size)
+        f = summarize(self.frames)
+        lines = [f"frame p50 {f['p50']:.1f}  p95 {f['p95']:.1f}  p99 {f['p99']:.1f}  max {f['max']:.1f} ms"]
+        for k, v in sorted(self.phases.items()):
+            s = summarize(v)
+            lines.append(f"{k:<10} p50 {s['p50']:.2f}  p99 {s['p99']:.2f} ms")
+        rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+        w = max(r.get_width() for r in rendered) + 12
+        h = sum(r.get_height() for r in rendered) + 12
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 170))
+        y = 6
+        for r in rendered:
+            surf.blit(r, (6, y))
+            y += r.get_height()
+        self._overlay_surf = surf
+        self._overlay_at = now
+        return surf
+
+profiler = FrameProfiler()
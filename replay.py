@@ -0,0 +1,142 @@
+import random
+import struct
+import time
+import pygame
+
+# ----------- Log Format -------------
+# Header: magic, version, RNG seed. Then a stream of tagged records:
+#   FRAME  dt in ms of the frame that follows
+#   KEY    key code, unicode code point (any plane)
+#   CLICK  mouse button, x, y
+#   QUIT
+#   SCENE  the scene manager switched scenes
+# Events belong to the last FRAME before them. Gameplay only depends on
+# the frame times, the events and the seed, so replaying the same log
+# produces the same game.
+MAGIC = b"FSRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBQ")
+FRAME, KEY, CLICK, QUIT, SCENE = range(5)
+RECORDS = {FRAME: struct.Struct("<H"), KEY: struct.Struct("<iI"),
+           CLICK: struct.Struct("<BHH"), QUIT: struct.Struct(""), SCENE: struct.Struct("")}
+
+def new_seed():
+    return random.SystemRandom().getrandbits(63)
+
+def seed_all(seed, state):
+    """Seed the menu/gift box randomness and the game's own RNG."""
+    random.seed(seed)
+    state.rng.seed(seed)
+
+def _encode(event):
+    if event.type == pygame.KEYDOWN:
+        return KEY, (event.key, ord(event.unicode[:1] or "\0"))
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return CLICK, (event.button, max(0, event.pos[0]), max(0, event.pos[1]))
+    if event.type == pygame.QUIT:
+        return QUIT, ()
+    return None
+
+def _decode(tag, fields):
+    if tag == KEY:
+        key, char = fields
+        return pygame.event.Event(pygame.KEYDOWN, key=key, unicode=chr(char) if char else "", mod=0)
+    if tag == CLICK:
+        button, x, y = fields
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y))
+    return pygame.event.Event(pygame.QUIT)
+
+# ----------- Recorder -------------
+class Recorder:
+    """Writes the seed, frame times and input events of a session."""
+
+    def __init__(self, path, seed):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self.seed = seed
+
+    def _write(self, tag, *fields):
+        self.file.write(bytes((tag,)) + RECORDS[tag].pack(*fields))
+
+    def scene(self):
+        self._write(SCENE)
+
+    def frame(self, dt, events):
+        self._write(FRAME, min(int(dt), 0xFFFF))
+        for event in events:
+            rec = _encode(event)
+            if rec: self._write(rec[0], *rec[1])
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+# ----------- Player -------------
+class Player:
+    """Feeds a recorded session back to the scene manager.
+
+    The log is split at its SCENE records. Scenes that follow the wall
+    clock (the intro video) can run a different number of frames on
+    replay, so the player keeps each scene's frames for that scene: if
+    the game switches early the rest are skipped, if it switches late it
+    gets empty frames until it does. With realtime=False frames are fed
+    as fast as the game can take them.
+    """
+
+    def __init__(self, path, realtime=True):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay log")
+        self.scenes = []     # per scene: [(dt, [events])]
+        pos = HEADER.size
+        while pos < len(data):
+            tag = data[pos]
+            fields = RECORDS[tag].unpack_from(data, pos + 1)
+            pos += 1 + RECORDS[tag].size
+            if tag == SCENE: self.scenes.append([])
+            elif tag == FRAME: self.scenes[-1].append((fields[0], []))
+            else: self.scenes[-1][-1][1].append(_decode(tag, fields))
+        self.realtime = realtime
+        self.scene_no = -1
+        self.frame_no = 0
+        self.frames = 0
+        self.started = None
+        self.played_ms = 0
+
+    @property
+    def done(self):
+        return self.scene_no >= len(self.scenes)
+
+    def scene(self):
+        self.scene_no += 1
+        self.frame_no = 0
+
+    def frame(self, default_dt):
+        """(dt, events) for the next frame of the current scene."""
+        if self.started is None:
+            self.started = time.perf_counter()
+        frames = self.scenes[self.scene_no] if not self.done else []
+        if self.frame_no < len(frames):
+            dt, events = frames[self.frame_no]
+            self.frame_no += 1
+        else:
+            dt, events = default_dt, []
+        self.frames += 1
+        self.played_ms += dt
+        if self.realtime:
+            ahead = self.started + self.played_ms / 1000 - time.perf_counter()
+            if ahead > 0: time.sleep(ahead)
+        return dt, events
+
+    @property
+    def finished(self):
+        """True once the last scene has run out of recorded frames."""
+        if not self.scenes: return True
+        return self.scene_no >= len(self.scenes) - 1 and self.frame_no >= len(self.scenes[-1])
+
+    def report(self):
+        took = time.perf_counter() - (self.started or time.perf_counter())
+        print(f"Replayed {self.frames} frames ({self.played_ms/1000:.1f}s of play) "
+              f"in {took:.2f}s, {self.frames/max(took, 1e-9):.0f} fps")
@@ -0,0 +1,135 @@
+import sys
+import pygame
+from idle import wait_events
+from profiler import profiler
+from latency import latency
+
+# ----------- Scenes -------------
+class Scene:
+    """One screen of the game.
+
+    The manager calls enter() when the scene becomes current, then
+    preload() so it can start loading whatever the next scene needs while
+    this one is still interactive. After that it calls handle() for each
+    event, update(dt) and render() once per frame, and exit() when the
+    scene is switched away from.
+    """
+
+    # Static screens set this and only wake up for input or a pending switch
+    waits_for_events = False
+
+    def enter(self): pass
+    def preload(self): pass
+    def handle(self, event): pass
+    def update(self, dt): pass
+    def render(self): pass
+    def exit(self): pass
+
+    def frame_rate(self):
+        return 60
+
+class SceneManager:
+    """Runs one scene at a time and switches between them.
+
+    switch(scene, delay_ms) replaces the old blocking delays: the current
+    scene keeps running, updating and drawing until the delay has passed.
+    Each frame is timed by the profiler (wait, events, update, render);
+    F3 toggles its on-screen overlay.
+
+    Delays count the frame times handed to the scenes rather than the wall
+    clock, so a recorder (replay.Recorder) that logs those frame times and
+    events, and a player (replay.Player) that feeds them back in place of
+    the real clock and event queue, reproduce a session exactly. A pacer
+    (latency.LowLatencyPacer) replaces clock.tick() and the poll after it
+    on animated screens.
+    """
+
+    def __init__(self, clock, recorder=None, player=None, pacer=None):
+        self.clock = clock
+        self.recorder = recorder
+        self.player = player
+        self.pacer = pacer
+        self.scene = None
+        self.pending = None
+        self.time = 0
+        self.switch_at = 0
+        self.switches = 0
+
+    def switch(self, scene, delay_ms=0):
+        self.pending = scene
+        self.switch_at = self.time + delay_ms
+
+    def _switch_due(self):
+        return self.pending is not None and self.time >= self.switch_at
+
+    def _enter(self, scene):
+        if self.scene is not None:
+            self.scene.exit()
+        self.scene = scene
+        self.pending = None
+        self.switches += 1
+        scene.manager = self
+        if self.recorder: self.recorder.scene()
+        if self.player: self.player.scene()
+        scene.enter()
+        scene.preload()
+        self.clock.tick()  # time spent switching is not the new scene's frame time
+        if self.pacer: self.pacer.reset()
+
+    def quit(self):
+        if self.scene is not None:
+            self.scene.exit()
+        if self.recorder: self.recorder.close()
+        if self.player: self.player.report()
+        pygame.quit()
+        sys.exit()
+
+    def run(self, scene):
+        self._enter(scene)
+        last_waiting = True
+        while True:
+            if self._switch_due():
+                self._enter(self.pending)
+            scene = self.scene
+            waiting = scene.waits_for_events and self.pending is None
+            # Frames spent asleep on a static screen are not profiled
+            if last_waiting: profiler.discard_frame()
+            else: profiler.end_frame()
+            profiler.begin_frame()
+            last_waiting = waiting
+            events = None
+            with profiler.phase("wait"):
+                if self.player:
+                    if self.player.finished: self.quit()
+                    # Only a window close gets through during replay
+                    if any(e.type == pygame.QUIT for e in pygame.event.get()): self.quit()
+                    dt, events = self.player.frame(1000 // scene.frame_rate())
+                elif waiting:
+                    events = wait_events()
+                    latency.polled()
+                    dt = self.clock.tick()
+                    if self.pacer: self.pacer.reset()
+                elif self.pacer:
+                    dt, events = self.pacer.wait(scene.frame_rate())
+                else:
+                    dt = self.clock.tick(scene.frame_rate())
+            with profiler.phase("events"):
+                if events is None:
+                    events = pygame.event.get()
+                    latency.polled()
+                if self.recorder: self.recorder.frame(dt, events)
+                self.time += dt
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        self.quit()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
+                        continue
+                    scene.handle(event)
+                    if self.pending is not None: break
+            if self._switch_due():
+                continue
+            with profiler.phase("update"):
+                scene.update(dt)
+            with profiler.phase("render"):
+                scene.render()
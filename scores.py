@@ -0,0 +1,140 @@
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY, player TEXT, campaign TEXT, mode TEXT, seed INTEGER,
+    started REAL, ended REAL, levels INTEGER DEFAULT 0, best INTEGER DEFAULT 0);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY, session TEXT, player TEXT, campaign TEXT, mode TEXT,
+    level INTEGER, score INTEGER, won INTEGER, reason TEXT, at REAL);
+CREATE TABLE IF NOT EXISTS progress (
+    player TEXT, campaign TEXT, mode TEXT, level INTEGER,
+    PRIMARY KEY (player, campaign, mode));
+CREATE INDEX IF NOT EXISTS results_board ON results (campaign, mode, level, score DESC);
+"""
+
+# ----------- Score Store -------------
+class ScoreStore:
+    """High scores, per-level results, level progress and session history
+    in SQLite, kept off the render thread.
+
+    Every call only queues work for one writer thread and returns at once.
+    The thread takes whatever has queued up (up to batch items, waiting
+    linger seconds for more) and writes it in one transaction, so a burst
+    of results costs one commit. The database is in WAL mode with
+    synchronous=NORMAL, so a commit is an append to the log, not an fsync
+    of the whole file.
+
+    Queries go through the same queue, so they see every write made before
+    them, and return a Future; screens check done() instead of waiting.
+    """
+
+    def __init__(self, path="scores.db", batch=64, linger=0.05):
+        self.path = path
+        self.batch = batch
+        self.linger = linger
+        self.queue = queue.Queue()
+        self.writes = 0
+        self.commits = 0
+        self.thread = threading.Thread(target=self._run, name="scores", daemon=True)
+        self.thread.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        return db
+
+    def _run(self):
+        try:
+            db = self._connect()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not open {self.path}, scores will not be saved: {e}")
+            db = None
+        while True:
+            items = [self.queue.get()]
+            deadline = time.monotonic() + self.linger
+            while len(items) < self.batch:
+                try: items.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty: break
+            writes = [i for i in items if i is not None and not isinstance(i[0], Future)]
+            if writes and db is not None:
+                try:
+                    with db:
+                        for sql, args in writes:
+                            db.execute(sql, args)
+                    self.writes += len(writes)
+                    self.commits += 1
+                except sqlite3.Error as e:
+                    print("Warning: Could not save scores:", e)
+            for item in items:
+                if item is None:
+                    if db is not None: db.close()
+                    return
+                if isinstance(item[0], Future):
+                    future, fn = item
+                    try: future.set_result(fn(db) if db is not None else None)
+                    except Exception as e: future.set_exception(e)
+
+    def _write(self, sql, *args):
+        self.queue.put((sql, args))
+
+    def _query(self, fn):
+        future = Future()
+        self.queue.put((future, fn))
+        return future
+
+    # ----------- Writes -------------
+    def start_session(self, player, campaign, mode, seed=None):
+        sid = uuid.uuid4().hex
+        self._write("INSERT INTO sessions (id, player, campaign, mode, seed, started) VALUES (?,?,?,?,?,?)",
+                    sid, player, campaign, mode, seed, time.time())
+        return sid
+
+    def record(self, session, player, campaign, mode, level, score, won, reason="", last=None):
+        """One finished level, won or lost. A win unlocks the next level,
+        up to last (the campaign's final level, if it has one)."""
+        self._write("INSERT INTO results (session, player, campaign, mode, level, score, won, reason, at) "
+                    "VALUES (?,?,?,?,?,?,?,?,?)",
+                    session, player, campaign, mode, level, score, int(won), reason, time.time())
+        self._write("UPDATE sessions SET levels = levels + 1, best = max(best, ?), ended = ? WHERE id = ?",
+                    score, time.time(), session)
+        if won:
+            self._write("INSERT INTO progress VALUES (?,?,?,?) ON CONFLICT (player, campaign, mode) "
+                        "DO UPDATE SET level = max(level, excluded.level)",
+                        player, campaign, mode, level + 1 if last is None else min(level + 1, last))
+
+    def end_session(self, session):
+        self._write("UPDATE sessions SET ended = ? WHERE id = ?", time.time(), session)
+
+    # ----------- Queries -------------
+    def top(self, campaign, mode, level=None, n=5):
+        """Future of the n best (player, score, level) rows, for one level or all."""
+        def query(db):
+            if level is None:
+                sql, args = "WHERE campaign = ? AND mode = ?", (campaign, mode)
+            else:
+                sql, args = "WHERE campaign = ? AND mode = ? AND level = ?", (campaign, mode, level)
+            return db.execute(f"SELECT player, score, level FROM results {sql} "
+                              "ORDER BY score DESC, at LIMIT ?", args + (n,)).fetchall()
+        return self._query(query)
+
+    def progress(self, player, campaign, mode):
+        """Future of the level the player has unlocked (1 if none)."""
+        def query(db):
+            row = db.execute("SELECT level FROM progress WHERE player = ? AND campaign = ? AND mode = ?",
+                             (player, campaign, mode)).fetchone()
+            return row[0] if row else 1
+        return self._query(query)
+
+    def close(self, timeout=2.0):
+        """Write what is queued and stop the thread."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
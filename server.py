@@ -0,0 +1,432 @@
+"""Multi-session game server: many headless games in one asyncio process.
+
+Every session runs the game_core rules (classic, rush or word mode) and
+they all advance together on one shared tick scheduler. Clients connect
+over TCP and speak newline-delimited JSON:
+
+    -> {"op": "join", "mode": "words", "level": 1, "seed": 7}
+    <- {"op": "joined", "session": 3, "mode": "words", "seed": 7}
+    -> {"op": "keys", "keys": "ap"}
+    <- {"op": "events", "tick": 120, "keys": 2, "events": [["letter", "A"], ...]}
+    <- {"op": "state", "tick": 120, "score": 4, ..., "fruits": [[id, x, y, label, cut], ...]}
+    <- {"op": "end", "win": false, "score": 9, "reason": "Time's up!"}
+    -> {"op": "stats"}    server and per-session tick costs
+
+    python server.py --port=8765                  host sessions
+    python server.py --load=200 --mode=words      load clients against it
+    python server.py --load=200 --serve           both in one process
+
+Clients that read too slowly are backpressured: state snapshots waiting to
+be sent are replaced by newer ones, and a client whose queue of events
+still grows past --queue lines is disconnected, so one stalled socket can
+never hold up the ticks for everyone else.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+import game_core
+from stats import summarize
+
+MODES = ("classic", "rush", "words")
+# One compact encoder for every message, instead of one per json.dumps()
+encode = json.JSONEncoder(separators=(",", ":")).encode
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def error(writer, reason):
+    """Tell a client what was wrong with its message."""
+    writer.write(encode({"op": "error", "reason": reason}).encode() + b"\n")
+
+# ----------- Sessions -------------
+def snapshot(state):
+    """What a client needs to draw the board and aim its keys."""
+    if isinstance(state, game_core.RushState):
+        from entities import CUT
+        store = state.store
+        idx = store.active().tolist()
+        words = getattr(state, "words", None)
+        fruits = [[i, int(store.x[i]), int(store.y[i]),
+                   words.get(i, "") if words is not None else chr(65 + int(store.letter[i])),
+                   bool(store.state[i] == CUT)] for i in idx]
+    else:
+        f = state.fruit
+        fruits = [[0, f["x"], int(f["y"]), f["letter"], f["cut"]]] if f else []
+    return {"score": state.score, "timer": state.timer, "missed": state.missed,
+            "level": state.level, "typed": getattr(state, "typed", ""), "fruits": fruits}
+
+class Session:
+    """One player's game, their typed keys and what is waiting to be sent."""
+
+    def __init__(self, sid, state, mode, seed, writer, max_queue, max_keys=32):
+        self.id = sid
+        self.state = state
+        self.mode = mode
+        self.seed = seed
+        self.writer = writer
+        self.max_queue = max_queue
+        self.max_keys = max_keys
+        self.keys = []          # typed since the last tick
+        self.out = deque()      # encoded lines waiting for the socket
+        self.latest = None      # newest state snapshot, replaced rather than queued
+        self.wake = asyncio.Event()
+        self.closed = False
+        self.reason = ""
+        self.task = None
+        self.costs = deque(maxlen=600)    # ms per tick, recent ticks
+        self.ticks = 0
+        self.sent = 0
+        self.replaced = 0       # snapshots overwritten before they went out
+        self.dropped_keys = 0
+
+    def type(self, keys):
+        room = self.max_keys - len(self.keys)
+        self.keys.extend(keys[:max(room, 0)])
+        self.dropped_keys += max(len(keys) - room, 0)
+
+    def send(self, msg):
+        if self.closed: return
+        self.out.append(encode(msg).encode() + b"\n")
+        if len(self.out) > self.max_queue:
+            self.close("too slow")
+        self.wake.set()
+
+    def send_state(self, msg):
+        if self.closed: return
+        if self.latest is not None: self.replaced += 1
+        self.latest = encode(msg).encode() + b"\n"
+        self.wake.set()
+
+    def close(self, reason=""):
+        if self.closed: return
+        self.closed = True
+        self.reason = reason
+        if reason == "too slow":
+            # drain() may be stuck on this client; don't wait for it
+            self.writer.transport.abort()
+        self.wake.set()
+
+    async def pump(self):
+        """Write queued lines; drain() blocks while the client is behind."""
+        try:
+            while True:
+                await self.wake.wait()
+                self.wake.clear()
+                lines = list(self.out)
+                self.out.clear()
+                if self.latest is not None:
+                    lines.append(self.latest)
+                    self.latest = None
+                if lines:
+                    self.writer.write(b"".join(lines))
+                    self.sent += len(lines)
+                    await self.writer.drain()
+                if self.closed and not self.out and self.latest is None:
+                    break
+        except (ConnectionError, OSError):
+            self.close("disconnected")
+        finally:
+            self.writer.close()
+
+    def stats(self):
+        return {"session": self.id, "mode": self.mode, "ticks": self.ticks,
+                "tick_ms": summarize(self.costs), "sent": self.sent,
+                "replaced": self.replaced, "dropped_keys": self.dropped_keys}
+
+# ----------- Server -------------
+class GameServer:
+    """Hosts the sessions and runs the tick scheduler.
+
+    One coroutine owns the simulation: every game_core.TICK it steps each
+    session once with the keys that arrived since the last tick, times the
+    step, and queues the events. Snapshots go out every snapshot_every
+    ticks. Ticks that fall behind are caught up by FixedTimestep (at most
+    max_frame at a time) and counted in late.
+    """
+
+    def __init__(self, send_rate=20, max_sessions=1000, max_queue=256, campaign="juicy_time"):
+        self.snapshot_every = max(1, round(1 / (game_core.TICK * send_rate)))
+        self.max_sessions = max_sessions
+        self.max_queue = max_queue
+        self.campaign = game_core.load_campaign(campaign)
+        self.dictionary = None
+        self.sessions = {}
+        self.handlers = set()   # connection tasks, awaited on shutdown
+        self.ids = itertools.count(1)
+        self.tick_no = 0
+        self.passes = deque(maxlen=600)   # ms to step every session once
+        self.costs = deque(maxlen=20000)  # ms per session step, all sessions
+        self.late = 0
+        self.games = 0
+        self.slow = 0
+
+    def new_state(self, mode, level, seed):
+        if mode == "words":
+            if self.dictionary is None:
+                from words import Dictionary
+                self.dictionary = Dictionary(game_core.WORDS_FILE, fallback=game_core.FRUIT_TYPES).load()
+            return game_core.WordState(self.dictionary, level, seed, self.campaign)
+        if mode == "rush":
+            return game_core.RushState(level, seed, self.campaign)
+        return game_core.GameState(level, seed, self.campaign)
+
+    # ----------- Connections -------------
+    async def handle(self, reader, writer):
+        session = None
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try: msg = json.loads(line)
+                except ValueError: continue
+                if not isinstance(msg, dict):
+                    error(writer, "expected an object")
+                    continue
+                op = msg.get("op")
+                if op == "keys" and session is not None:
+                    session.type(str(msg.get("keys", "")))
+                elif op == "join" and session is None:
+                    session = self.join(msg, writer)
+                    if session is None: break
+                    session.task = asyncio.ensure_future(session.pump())
+                elif op == "stats":
+                    writer.write(json.dumps(dict(self.stats(), op="stats")).encode() + b"\n")
+                elif op == "bye":
+                    break
+                if session is not None and session.closed: break
+        except (ConnectionError, OSError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            if session is not None:
+                session.close("left")
+                self.drop(session)
+            else:
+                writer.close()
+
+    def join(self, msg, writer):
+        """A new session for a join message, or None after replying with
+        an error."""
+        mode, seed, level = msg.get("mode", "classic"), msg.get("seed"), msg.get("level", 1)
+        if mode not in MODES: reason = "bad mode"
+        elif seed is not None and not is_int(seed): reason = "seed must be an integer"
+        elif not is_int(level) or level < 1: reason = "level must be a positive integer"
+        elif len(self.sessions) >= self.max_sessions: reason = "server full"
+        else: reason = None
+        if reason:
+            error(writer, reason)
+            return None
+        if seed is None: seed = random.getrandbits(63)
+        session = Session(next(self.ids), self.new_state(mode, level, seed), mode, seed, writer, self.max_queue)
+        self.sessions[session.id] = session
+        self.games += 1
+        session.send({"op": "joined", "session": session.id, "mode": mode, "seed": seed})
+        return session
+
+    def drop(self, session):
+        if self.sessions.pop(session.id, None) is not None and session.reason == "too slow":
+            self.slow += 1
+
+    # ----------- Ticks -------------
+    def tick(self):
+        self.tick_no += 1
+        snap = self.tick_no % self.snapshot_every == 0
+        start = time.perf_counter()
+        for session in list(self.sessions.values()):
+            if session.closed:
+                self.drop(session)
+                continue
+            state = session.state
+            t = time.perf_counter()
+            events = game_core.step(state, session.keys, game_core.TICK)
+            cost = (time.perf_counter() - t) * 1000
+            session.costs.append(cost)
+            self.costs.append(cost)
+            session.ticks += 1
+            keys = len(session.keys)
+            session.keys = []
+            # New fruit shows up in the next snapshot
+            events = [e for e in events if e[0] != "spawn"]
+            if events or keys:
+                session.send({"op": "events", "tick": self.tick_no, "keys": keys, "events": events})
+            if state.game_win and not state.campaign.is_last(state.level):
+                state.reset(state.level + 1)
+                session.send({"op": "level", "level": state.level})
+            elif state.finished:
+                session.send({"op": "end", "win": state.game_win, "score": state.score,
+                              "level": state.level, "reason": state.lose_reason})
+                session.close("finished")
+                continue
+            if snap:
+                session.send_state(dict(snapshot(state), op="state", tick=self.tick_no))
+        self.passes.append((time.perf_counter() - start) * 1000)
+
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        stepper = game_core.FixedTimestep()
+        last = loop.time()
+        while True:
+            await asyncio.sleep(max(0.0, stepper.tick - stepper.accumulator - (loop.time() - last)))
+            now = loop.time()
+            n = stepper.ticks(now - last)
+            last = now
+            if n > 1: self.late += n - 1
+            for _ in range(n):
+                self.tick()
+
+    def stats(self):
+        sessions = list(self.sessions.values())
+        slowest = sorted(sessions, key=lambda s: max(s.costs, default=0), reverse=True)[:5]
+        return {"sessions": len(sessions), "games": self.games, "ticks": self.tick_no,
+                "late_ticks": self.late, "slow_disconnects": self.slow,
+                "tick_pass_ms": summarize(self.passes), "session_tick_ms": summarize(self.costs),
+                "slowest": [s.stats() for s in slowest]}
+
+    def report(self):
+        s = self.stats()
+        p, c = s["tick_pass_ms"], s["session_tick_ms"]
+        print(f"Server: {s['sessions']} sessions ({s['games']} games), tick {s['ticks']}, "
+              f"{s['late_ticks']} late ticks, {s['slow_disconnects']} slow clients dropped")
+        print(f"  all sessions per tick: p50 {p['p50']:.2f} p99 {p['p99']:.2f} max {p['max']:.2f} ms")
+        print(f"  one session per tick:  p50 {c['p50']*1000:.0f} p99 {c['p99']*1000:.0f} max {c['max']*1000:.0f} us")
+
+    async def serve(self, host, port, stats_every=0):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on {host}:{port}")
+        asyncio.ensure_future(self.run_ticks())
+        if stats_every:
+            asyncio.ensure_future(self._report_every(stats_every))
+        return server
+
+    async def shutdown(self, listener):
+        """Stop accepting, then close every client so its handler returns."""
+        listener.close()
+        for session in list(self.sessions.values()):
+            session.close("shutdown")
+            session.writer.close()
+        if self.handlers:
+            await asyncio.wait(list(self.handlers), timeout=2.0)
+        await listener.wait_closed()
+
+    async def _report_every(self, seconds):
+        while True:
+            await asyncio.sleep(seconds)
+            self.report()
+
+# ----------- Load Client -------------
+async def play(host, port, mode, seed, results, cps=6.0, accuracy=0.99):
+    """One game: types the label of the lowest uncut fruit at about cps
+    keys per second and times each key until the server's reply."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({"op": "join", "mode": mode, "seed": seed}).encode() + b"\n")
+    view = None
+    sent_at = deque()
+    seen = 0                # tick that consumed our last key
+    next_key = 0.0
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line: break
+            msg = json.loads(line)
+            op = msg["op"]
+            if op == "events":
+                # keys is how many of ours that tick consumed
+                for _ in range(min(msg["keys"], len(sent_at))):
+                    results["rtt"].append((loop.time() - sent_at.popleft()) * 1000)
+                if msg["keys"]: seen = msg["tick"]
+            elif op == "state":
+                view = msg
+            elif op == "end":
+                results["scores"].append(msg["score"])
+                reason = msg["reason"] or "winning"
+                results["reasons"][reason] = results["reasons"].get(reason, 0) + 1
+                results["wins"] += msg["win"]
+                break
+            elif op == "error":
+                results["errors"] += 1
+                break
+            # Aim only from a snapshot taken after the last key was applied
+            if view is None or sent_at or view["tick"] < seen or loop.time() < next_key: continue
+            typed = view["typed"]
+            live = [f for f in view["fruits"] if not f[4] and f[3].startswith(typed)]
+            if not live: continue
+            label = max(live, key=lambda f: f[2])[3]
+            key = label[len(typed)] if len(typed) < len(label) else label[0]
+            if rng.random() > accuracy: key = rng.choice("QXZJ")
+            writer.write(json.dumps({"op": "keys", "keys": key.lower()}).encode() + b"\n")
+            sent_at.append(loop.time())
+            next_key = loop.time() + rng.expovariate(cps)
+    finally:
+        writer.close()
+
+async def bot(host, port, mode, seed, results, **kw):
+    """Plays game after game, each with its own seed, until cancelled."""
+    for game in itertools.count():
+        await play(host, port, mode, seed * 1000 + game, results, **kw)
+
+async def load(host, port, clients, mode, duration, seed=0, **kw):
+    results = {"rtt": [], "scores": [], "wins": 0, "errors": 0, "reasons": {}}
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(bot(host, port, mode, seed + i, results, **kw)) for i in range(clients)]
+    done, pending = await asyncio.wait(tasks, timeout=duration)
+    for t in pending: t.cancel()
+    # A bot only stops early if its connection failed
+    failed = sum(1 for t in done if t.exception() is not None)
+    took = time.perf_counter() - start
+    rtt = summarize(results["rtt"])
+    print(f"Load: {clients} {mode} clients for {took:.1f}s, {len(results['scores'])} games finished "
+          f"({results['wins']} won), {failed + results['errors']} failed")
+    print(f"  key to reply: p50 {rtt['p50']:.1f} p95 {rtt['p95']:.1f} p99 {rtt['p99']:.1f} ms over {rtt['n']} keys")
+    if results["reasons"]:
+        print("  games ended by: " + ", ".join(f"{r} {n}" for r, n in sorted(results["reasons"].items())))
+    return results
+
+# ----------- Command Line -------------
+def parse_args(argv):
+    p = argparse.ArgumentParser(description="Host many headless game sessions, or load-test a host.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--campaign", default="juicy_time")
+    p.add_argument("--send-rate", type=float, default=20, help="state snapshots per second")
+    p.add_argument("--max-sessions", type=int, default=1000)
+    p.add_argument("--queue", type=int, default=256, help="lines queued before a client is dropped")
+    p.add_argument("--stats-every", type=float, default=10, help="seconds between reports (0: off)")
+    p.add_argument("--load", type=int, default=0, metavar="CLIENTS", help="run load clients instead of serving")
+    p.add_argument("--serve", action="store_true", help="with --load, also host the server in-process")
+    p.add_argument("--mode", default="classic", choices=MODES, help="mode the load clients play")
+    p.add_argument("--duration", type=float, default=30, help="seconds the load runs at most")
+    p.add_argument("--seed", type=int, default=0, help="first load client seed")
+    p.add_argument("--cps", type=float, default=6.0, help="keys per second per load client")
+    p.add_argument("--accuracy", type=float, default=0.99, help="fraction of load client keys that are right")
+    return p.parse_args(argv)
+
+async def amain(opts):
+    server = None
+    if not opts.load or opts.serve:
+        server = GameServer(opts.send_rate, opts.max_sessions, opts.queue, opts.campaign)
+        listener = await server.serve(opts.host, opts.port, 0 if opts.load else opts.stats_every)
+    if not opts.load:
+        async with listener:
+            await listener.serve_forever()
+    await load(opts.host, opts.port, opts.load, opts.mode, opts.duration, opts.seed,
+               cps=opts.cps, accuracy=opts.accuracy)
+    if server:
+        server.report()
+        await server.shutdown(listener)
+
+def main(argv=None):
+    opts = parse_args(argv)
+    try:
+        asyncio.run(amain(opts))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
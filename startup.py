@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_t0 = time.perf_counter()
+
+# ----------- Startup Profile -------------
+class StartupProfile:
+    """Per-phase startup timings; mark(name) closes the phase ending now."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []
+        self.last = _t0
+        self.reported = False
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled or self.reported: return
+        self.reported = True
+        total = sum(t for _, t in self.phases)
+        print("Startup profile:")
+        for name, t in self.phases:
+            print(f"  {name:<24}{t*1000:8.1f} ms")
+        print(f"  {'total':<24}{total*1000:8.1f} ms")
+
+# ----------- Background Loader -------------
+class BackgroundLoader:
+    """Runs asset loads on one worker thread while the menu is up.
+
+    submit(key, fn, *args) queues a load; get(key) returns its result,
+    waiting only if it has not finished yet.
+    """
+
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        self.jobs = {}
+
+    def submit(self, key, fn, *args):
+        if key not in self.jobs:
+            self.jobs[key] = self.pool.submit(fn, *args)
+        return self.jobs[key]
+
+    def get(self, key, fn=None, *args):
+        job = self.jobs.get(key)
+        if job is None:
+            return fn(*args) if fn else None
+        return job.result()
+
+    def ready(self, key):
+        job = self.jobs.get(key)
+        return job is not None and job.done()
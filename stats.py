@@ -0,0 +1,11 @@
+# ----------- Percentiles -------------
+def percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    i = min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+def summarize(values):
+    vals = sorted(values)
+    return {"p50": percentile(vals, 0.50), "p95": percentile(vals, 0.95),
+            "p99": percentile(vals, 0.99), "max": vals[-1] if vals else 0.0,
+            "n": len(vals)}
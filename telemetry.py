@@ -0,0 +1,261 @@
+"""Gameplay telemetry: fixed-size binary events, logged off the game thread.
+
+The game packs each event into a ring buffer (no locks, no allocation);
+a writer thread drains it into gzip-compressed, append-only log files
+that rotate at a size limit. Reading streams the files, so any amount of
+logs can be summarised in constant memory:
+
+    python telemetry.py telemetry/           per-level summary as JSON
+    python telemetry.py a.tlm.gz b.tlm.gz
+"""
+import gzip
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+from game_core import FRUIT_TYPES
+
+# ----------- Log Format -------------
+# Each file: a header (magic, version, wall time it was opened), then
+# records of kind, game time in ms since the level started, level, fruit
+# (index into FRUIT_TYPES, -1 for none), character, and a value:
+#   SPAWN   -
+#   CUT     score after the cut
+#   WRONG   the wrong key, in character
+#   MISS    misses so far this level
+#   FILL    boxes full so far
+#   WIN     final score
+#   LOSE    final score; character is the index of the reason in REASONS
+#   TYPO    the key (word mode)
+#   LETTER  the key (word mode)
+MAGIC = b"FSTL"
+VERSION = 1
+HEADER = struct.Struct("<4sBd")
+RECORD = struct.Struct("<BIHbBi")
+SPAWN, CUT, WRONG, MISS, FILL, WIN, LOSE, TYPO, LETTER = range(9)
+NAMES = ("spawn", "cut", "wrong_key", "miss", "fill", "win", "lose", "typo", "letter")
+KINDS = {"spawn": SPAWN, "cut": CUT, "wrong_key": WRONG, "miss": MISS, "fill": FILL,
+         "win": WIN, "game_over": LOSE, "typo": TYPO, "letter": LETTER}
+REASONS = ("", "Time's up!", "Too many fruits missed!", "Wrong key pressed!")
+FRUITS = {name: i for i, name in enumerate(FRUIT_TYPES)}
+
+# ----------- Ring Buffer -------------
+class RingBuffer:
+    """Single-producer, single-consumer queue of packed records.
+
+    head and tail only ever grow and each has one writer, and a record is
+    packed before head moves past it, so the game thread and the writer
+    thread need no lock. When the writer falls a whole buffer behind,
+    new records are dropped (and counted) rather than blocking the game.
+    """
+
+    def __init__(self, records, record=RECORD):
+        self.record = record
+        self.capacity = records
+        self.buf = bytearray(records * record.size)
+        self.head = 0         # records pushed; moved only by push()
+        self.tail = 0         # records drained; moved only by drain()
+        self.dropped = 0
+
+    def push(self, *fields):
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return False
+        self.record.pack_into(self.buf, (head % self.capacity) * self.record.size, *fields)
+        self.head = head + 1
+        return True
+
+    def drain(self):
+        """Bytes of every record pushed since the last drain."""
+        head, tail, size = self.head, self.tail, self.record.size
+        if head == tail: return b""
+        start, end = tail % self.capacity, head % self.capacity
+        if start < end:
+            data = bytes(self.buf[start*size:end*size])
+        else:
+            data = bytes(self.buf[start*size:]) + bytes(self.buf[:end*size])
+        self.tail = head
+        return data
+
+# ----------- Writer -------------
+class Telemetry:
+    """Game events to rotated gzip logs, written by a background thread.
+
+    game(events, state) takes the (kind, detail) events of a game_core
+    step. Every interval seconds the writer drains the ring buffer and
+    appends it to the current file with a sync flush, so a crash loses at
+    most one interval; a file whose compressed size passes max_bytes is
+    finished and a new one started.
+    """
+
+    def __init__(self, directory="telemetry", max_bytes=8 << 20, records=1 << 16, interval=0.5):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.ring = RingBuffer(records)
+        self.stopped = threading.Event()
+        self.files = 0
+        self.file = None
+        self.raw = None
+        self.written = 0
+        self.thread = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+        return self
+
+    # ----------- Game Thread -------------
+    def log(self, kind, ms, level, fruit=-1, char=0, value=0):
+        self.ring.push(kind, ms, level, fruit, char, value)
+
+    def game(self, events, state):
+        ms = int(state.elapsed * 1000)
+        level = state.level
+        for kind, detail in events:
+            code = KINDS.get(kind)
+            if code is None: continue
+            if code == CUT:
+                self.log(code, ms, level, FRUITS.get(detail[0], -1), 0, state.score)
+            elif code in (WRONG, TYPO, LETTER):
+                self.log(code, ms, level, -1, ord(detail[:1] or "\0") & 0xFF)
+            elif code == MISS:
+                self.log(code, ms, level, FRUITS.get(detail, -1), 0, state.missed)
+            elif code == FILL:
+                self.log(code, ms, level, FRUITS.get(detail, -1), 0, state.board.completed)
+            elif code == WIN:
+                self.log(code, ms, level, -1, 0, state.score)
+            elif code == LOSE:
+                reason = REASONS.index(detail) if detail in REASONS else 0
+                self.log(code, ms, level, -1, reason, state.score)
+            else:
+                self.log(code, ms, level, FRUITS.get(detail, -1))
+
+    # ----------- Writer Thread -------------
+    def _open(self):
+        self.files += 1
+        name = f"telemetry-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.files:03d}.tlm.gz"
+        self.raw = open(os.path.join(self.directory, name), "ab")
+        # Level 1: the writer must keep up with the ring and finish in
+        # close()'s timeout; records compress well at any level
+        self.file = gzip.GzipFile(fileobj=self.raw, mode="wb", compresslevel=1)
+        self.file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+
+    def _finish(self):
+        if self.file is not None:
+            self.file.close()
+            self.raw.close()
+            self.file = self.raw = None
+
+    def _flush(self):
+        data = self.ring.drain()
+        if not data: return
+        if self.file is None: self._open()
+        self.file.write(data)
+        self.file.flush()     # sync flush: everything so far is readable
+        self.written += len(data) // RECORD.size
+        if self.raw.tell() >= self.max_bytes:
+            self._finish()
+
+    def _run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                self._flush()
+            self._flush()
+        except OSError as e:
+            print("Warning: Could not write telemetry:", e)
+        finally:
+            self._finish()
+
+    def close(self, timeout=2.0):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def report(self):
+        print(f"Telemetry: {self.written} events in {self.files} files, "
+              f"{self.ring.dropped} dropped, in {self.directory}/")
+
+# ----------- Reading -------------
+def log_files(paths):
+    """The .tlm.gz files named by paths (files or directories), oldest first."""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            out.extend(sorted(os.path.join(p, f) for f in os.listdir(p) if f.endswith(".tlm.gz")))
+        else:
+            out.append(p)
+    return out
+
+def _inflate(f, chunk):
+    """Decompressed pieces of the gzip stream in f as they come. Unlike
+    GzipFile, which drops what it decoded in a read that hits a cut-off
+    end, this yields everything up to the damage and then stops."""
+    d = zlib.decompressobj(wbits=31)
+    while True:
+        raw = f.read(chunk)
+        if not raw: return
+        while raw:
+            try: out = d.decompress(raw)
+            except zlib.error: return
+            if out: yield out
+            raw = b""
+            if d.eof:     # another gzip member may follow
+                raw = d.unused_data
+                d = zlib.decompressobj(wbits=31)
+
+def read(path, chunk=1 << 16):
+    """Yield the records of one log, streaming it in chunk-byte reads. A
+    file cut off by a crash is read up to its last complete record."""
+    with open(path, "rb") as f:
+        data, header = b"", False
+        for out in _inflate(f, chunk):
+            data += out
+            if not header:
+                if len(data) < HEADER.size: continue
+                magic, version, _ = HEADER.unpack_from(data)
+                if magic != MAGIC or version != VERSION:
+                    raise ValueError(f"{path} is not a version {VERSION} telemetry log")
+                data, header = data[HEADER.size:], True
+            n = len(data) - len(data) % RECORD.size
+            yield from RECORD.iter_unpack(data[:n])
+            data = data[n:]
+
+def aggregate(paths):
+    """Per-level event counts, per-fruit cuts and misses, wrong keys by
+    letter, and how games ended, streamed over every record."""
+    levels = defaultdict(lambda: defaultdict(int))
+    fruits = defaultdict(lambda: defaultdict(int))
+    wrong = defaultdict(int)
+    endings = defaultdict(int)
+    records = 0
+    for path in log_files(paths):
+        for kind, ms, level, fruit, char, value in read(path):
+            records += 1
+            levels[level][NAMES[kind]] += 1
+            if kind in (CUT, MISS, SPAWN) and fruit >= 0:
+                fruits[FRUIT_TYPES[fruit]][NAMES[kind]] += 1
+            elif kind == WRONG:
+                wrong[chr(char)] += 1
+            elif kind == LOSE:
+                endings[REASONS[char] if char < len(REASONS) else "?"] += 1
+            elif kind == WIN:
+                endings["win"] += 1
+    return {"records": records,
+            "levels": {lv: dict(c) for lv, c in sorted(levels.items())},
+            "fruits": {f: dict(c) for f, c in sorted(fruits.items())},
+            "wrong_keys": dict(sorted(wrong.items(), key=lambda kv: -kv[1])),
+            "endings": dict(endings)}
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    summary = aggregate(sys.argv[1:] or ["telemetry"])
+    took = time.perf_counter() - start
+    print(json.dumps(summary, indent=1))
+    print(f"{summary['records']} records in {took:.2f}s", file=sys.stderr)
@@ -0,0 +1,43 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+import pytest
+from dirty_render import DirtyRenderer, LABELS, HUD
+
+SIZE = (200, 120)
+
+def blob(color, size):
+    """A soft-edged sprite: overdrawing its alpha edge changes its pixels."""
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.ellipse(surf, color + (140,), surf.get_rect())
+    pygame.draw.ellipse(surf, color + (255,), surf.get_rect().inflate(-8, -8))
+    return surf
+
+def frames(enabled, n=40):
+    """Screen contents after each frame of a little scene: a fixed label,
+    one sprite falling through it and a second one touching the first."""
+    screen = pygame.display.set_mode(SIZE)
+    background = pygame.Surface(SIZE)
+    background.fill((40, 90, 160))
+    renderer = DirtyRenderer(screen, enabled)
+    renderer.set_background(background)
+    label, fruit, other = blob((250, 250, 250), (60, 20)), blob((200, 40, 40), (30, 30)), blob((40, 200, 40), (30, 30))
+    out = []
+    for i in range(n):
+        renderer.draw("label", label, (10, 16), HUD)
+        renderer.draw("fruit", fruit, (20 + i, -20 + 3*i))
+        renderer.draw("other", other, (70, 40), LABELS)
+        if i % 10 == 5: renderer.draw("flash", blob((255, 220, 0), (20, 20)), (5, 5 + i))
+        renderer.present()
+        out.append(pygame.image.tobytes(screen, "RGB"))
+    return out
+
+@pytest.fixture(autouse=True)
+def display():
+    pygame.display.init()
+    yield
+    pygame.display.quit()
+
+def test_dirty_rects_match_full_flip():
+    full, dirty = frames(False), frames(True)
+    assert [i for i, (a, b) in enumerate(zip(full, dirty)) if a != b] == []
@@ -0,0 +1,25 @@
+import game_core
+from scores import ScoreStore
+
+def test_progress_stops_at_the_last_level(tmp_path):
+    campaign = game_core.load_campaign("harika")    # one level, "after_last": "win"
+    assert campaign.last_level == len(campaign) == 1
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    try:
+        sid = store.start_session("p", campaign.name, "classic")
+        store.record(sid, "p", campaign.name, "classic", 1, 30, True, last=campaign.last_level)
+        assert store.progress("p", campaign.name, "classic").result(timeout=5) == 1
+    finally:
+        store.close()
+
+def test_progress_keeps_going_in_a_repeating_campaign(tmp_path):
+    campaign = game_core.load_campaign("juicy_time")
+    assert campaign.last_level is None
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    try:
+        sid = store.start_session("p", campaign.name, "classic")
+        for level in range(1, 4):
+            store.record(sid, "p", campaign.name, "classic", level, 30, True, last=campaign.last_level)
+        assert store.progress("p", campaign.name, "classic").result(timeout=5) == 4
+    finally:
+        store.close()
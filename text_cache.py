@@ -0,0 +1,114 @@
+import pygame
+from collections import OrderedDict
+
+# ----------- Font Pool -------------
+class FontPool:
+    """One pygame Font per (family, size, bold), created on first use."""
+
+    def __init__(self):
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, family, size, bold=False):
+        key = (family, size, bold)
+        f = self.fonts.get(key)
+        if f is None:
+            self.misses += 1
+            f = pygame.font.SysFont(family, size, bold=bold)
+            self.fonts[key] = f
+        else:
+            self.hits += 1
+        return f
+
+# ----------- Outlined Text Cache -------------
+class OutlinedTextCache:
+    """LRU cache of pre-composited outlined text surfaces.
+
+    Each entry is the text rendered once in its fill color and once in its
+    outline color, with the outline blitted at the four offsets, so drawing
+    a cached label is a single blit.
+    """
+
+    def __init__(self, family="arial", bold=True, outline=2, max_entries=256, max_bytes=8*1024*1024):
+        self.family = family
+        self.bold = bold
+        self.outline = outline
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.fonts = FontPool()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _compose(self, text, size, color, outline_color):
+        f = self.fonts.get(self.family, size, self.bold)
+        surf = f.render(text, True, color)
+        outline = f.render(text, True, outline_color)
+        o = self.outline
+        w, h = surf.get_size()
+        out = pygame.Surface((w + 2*o, h + 2*o), pygame.SRCALPHA)
+        for dx, dy in [(-o,0),(o,0),(0,-o),(0,o)]:
+            out.blit(outline, (o+dx, o+dy))
+        out.blit(surf, (o, o))
+        return out
+
+    def render(self, text, size, color, outline_color):
+        """Return the outlined surface for text, rendering it on a miss."""
+        key = (text, size, tuple(color), tuple(outline_color))
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self._compose(text, size, color, outline_color)
+        self.entries[key] = surf
+        self.bytes += _surface_bytes(surf)
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            if len(self.entries) == 1:
+                break
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= _surface_bytes(old)
+            self.evictions += 1
+        return surf
+
+    def layout(self, text, size, color, outline_color, x, y, center=True):
+        """Return (surface, rect) for outlined text placed at x, y."""
+        surf = self.render(text, size, color, outline_color)
+        rect = surf.get_rect()
+        if center: rect.center = (x, y)
+        else: rect.topleft = (x - self.outline, y - self.outline)
+        return surf, rect
+
+    def draw(self, target, text, size, color, outline_color, x, y, center=True):
+        """Blit outlined text onto target and return the covered rect."""
+        surf, rect = self.layout(text, size, color, outline_color, x, y, center)
+        return target.blit(surf, rect)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "fonts": len(self.fonts.fonts),
+            "font_hits": self.fonts.hits,
+            "font_misses": self.fonts.misses,
+        }
+
+def _surface_bytes(surf):
+    w, h = surf.get_size()
+    return w * h * surf.get_bytesize()
+
+# Shared cache used by the game scripts
+text_cache = OutlinedTextCache()
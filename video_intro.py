@@ -0,0 +1,120 @@
+import threading
+import queue
+import time
+import pygame
+
+END = object()
+
+# ----------- Video Decoder -------------
+class VideoDecoder(threading.Thread):
+    """Decodes a video on a worker thread into a small queue of RGB frames.
+
+    Frames are resized to the logical screen size in OpenCV before color
+    conversion, so the render thread only wraps the bytes in a surface.
+    When playback runs ahead of decoding, the worker grabs past late frames
+    without decoding them; the render side drops or repeats frames to follow
+    whatever clock it passes to frame_at().
+    """
+
+    def __init__(self, filename, size, max_frames=6):
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.size = size
+        self.frames = queue.Queue(max_frames)
+        self.stopped = threading.Event()
+        self.opened = threading.Event()
+        self.ok = False
+        self.fps = 30.0
+        self.target = 0
+        self.pending = None
+        self.decoded = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def run(self):
+        cap = None
+        idx = 0
+        try:
+            import cv2  # heavy; only needed once the intro actually plays
+            cap = cv2.VideoCapture(self.filename)
+            self.ok = cap.isOpened()
+            if self.ok:
+                self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            self.opened.set()
+            while self.ok and not self.stopped.is_set():
+                if idx < self.target:
+                    if not cap.grab(): break
+                    idx += 1
+                    self.skipped += 1
+                    continue
+                ret, frame = cap.read()
+                if not ret: break
+                frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                self.decoded += 1
+                if not self._put((idx, frame)): break
+                idx += 1
+        except ImportError:
+            print("Warning: OpenCV is not installed, skipping the intro video.")
+        finally:
+            # Without cv2 (or if it fails to load) ok stays False, and the
+            # scene waiting on opened moves on at once
+            self.opened.set()
+            if cap is not None: cap.release()
+            self._put(END)
+
+    def _put(self, item):
+        """Queue item, sleeping while the queue is full; False once stopped
+        (stop() empties the queue to wake a blocked put)."""
+        if self.stopped.is_set(): return False
+        self.frames.put(item)
+        return not self.stopped.is_set()
+
+    def wait_opened(self, timeout=5.0):
+        return self.opened.wait(timeout) and self.ok
+
+    def frame_at(self, t):
+        """Newest frame due at t seconds, None to keep showing the current
+        one, or END once the video has finished."""
+        self.target = int(t * self.fps)
+        latest = None
+        while True:
+            if self.pending is None:
+                try: self.pending = self.frames.get_nowait()
+                except queue.Empty: return latest
+            if self.pending is END:
+                return latest if latest is not None else END
+            idx, frame = self.pending
+            if idx > self.target:
+                return latest
+            if latest is not None:
+                self.dropped += 1
+            latest = frame
+            self.pending = None
+
+    def stop(self):
+        self.stopped.set()
+        try:
+            while True: self.frames.get_nowait()
+        except queue.Empty:
+            pass
+        if self.ident is not None: self.join(timeout=1.0)
+
+def frame_surface(frame):
+    """Wrap an RGB frame in a surface without copying it."""
+    h, w = frame.shape[:2]
+    return pygame.image.frombuffer(frame, (w, h), "RGB")
+
+class MediaClock:
+    """Playback time from the music channel, or wall time without music."""
+
+    def __init__(self, use_music=True):
+        self.use_music = use_music
+        self.start = time.perf_counter()
+
+    def now(self):
+        if self.use_music:
+            pos = pygame.mixer.music.get_pos()
+            if pos >= 0:
+                return pos / 1000
+        return time.perf_counter() - self.start
@@ -0,0 +1,131 @@
+import threading
+
+# ----------- Dictionary -------------
+class Dictionary:
+    """Word list read from a text file (one word per line) on first use.
+
+    Only plain A-Z words of min_len..max_len letters are kept, ordered by
+    length, so pick() can draw a word no longer than n letters with one
+    random index. load() may run on a background thread; anything that
+    needs the words waits for it.
+    """
+
+    def __init__(self, path, min_len=3, max_len=10, fallback=()):
+        self.path = path
+        self.min_len = min_len
+        self.max_len = max_len
+        self.fallback = list(fallback)
+        self.words = None
+        self.upto = None      # upto[n] = how many words have at most n letters
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.words is not None: return self
+            try:
+                with open(self.path, encoding="utf-8", errors="ignore") as f:
+                    raw = f.read().upper().split()
+            except OSError:
+                print(f"Warning: Could not load {self.path}, using fallback words.")
+                raw = []
+            # Bucket by length rather than sort; dict keeps file order, so
+            # the list (and a seeded game's words) is the same every run
+            buckets = [[] for _ in range(self.max_len + 1)]
+            lo, hi = self.min_len, self.max_len
+            for w in dict.fromkeys(raw):
+                if lo <= len(w) <= hi and w.isascii() and w.isalpha():
+                    buckets[len(w)].append(w)
+            if not any(buckets):
+                for w in dict.fromkeys(w.upper() for w in self.fallback):
+                    buckets[min(max(len(w), lo), hi)].append(w)
+            words, upto = [], []
+            for bucket in buckets:
+                words.extend(bucket)
+                upto.append(len(words))
+            self.upto = upto
+            self.words = words
+        return self
+
+    def __len__(self):
+        return len(self.load().words)
+
+    def pick(self, rng, max_len):
+        """A random word of at most max_len letters (or the shortest ones)."""
+        self.load()
+        n = self.upto[min(max(max_len, self.min_len), self.max_len)] or len(self.words)
+        return self.words[rng.randrange(n)]
+
+# ----------- Prefix Trie -------------
+class Node:
+    __slots__ = ("children", "count", "slots")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0        # active words at or below this node
+        self.slots = []       # fruits whose whole word ends here
+
+class WordTrie:
+    """Prefix tree over the words currently on screen.
+
+    The typing cursor is a node: each key follows one child link, so a
+    keystroke costs the same with five words on screen or five hundred.
+    Words are removed as their fruit is cut or missed; nodes no active
+    word passes through are dropped, and if the cursor was on one the
+    typed prefix is lost.
+    """
+
+    def __init__(self):
+        self.root = Node()
+        self.node = self.root
+        self.typed = ""
+
+    def add(self, word, slot):
+        node = self.root
+        node.count += 1
+        for ch in word:
+            node = node.children.setdefault(ch, Node())
+            node.count += 1
+        node.slots.append(slot)
+
+    def remove(self, word, slot):
+        node, detach = self.root, None
+        node.count -= 1
+        for ch in word:
+            child = node.children[ch]
+            child.count -= 1
+            if child.count == 0 and detach is None:
+                detach = (node, ch)
+            node = child
+        node.slots.remove(slot)
+        if detach:
+            del detach[0].children[detach[1]]
+        if self.node.count == 0 and self.node is not self.root:
+            self.reset()
+
+    def reset(self):
+        self.node = self.root
+        self.typed = ""
+
+    def type(self, ch):
+        """Advance the cursor by one letter.
+
+        Returns ("letter", None) for a letter that continues some word,
+        ("word", slot) when it completes one (the cursor goes back to the
+        root), or ("typo", None) when no word on screen continues the
+        prefix or starts with ch.
+        """
+        nxt = self.node.children.get(ch)
+        if nxt is None and self.node is not self.root:
+            # Start over: the key may begin another word
+            self.reset()
+            nxt = self.root.children.get(ch)
+        if nxt is None:
+            self.reset()
+            return "typo", None
+        self.node = nxt
+        self.typed += ch
+        if nxt.slots:
+            slot = nxt.slots[0]
+            self.reset()
+            return "word", slot
+        return "letter", None